@@ -1,605 +1,366 @@
+import functools
+import html as html_text
+import json
+import math
+import time
+from urllib.parse import urlencode
+
 import streamlit as st
 from streamlit.components.v1 import html
-import base64
-from pathlib import Path
-import time
 
-# Function to load and encode image to Base64
-@st.cache_data
-def get_base64_of_bin_file(bin_file):
-    try:
-        with open(bin_file, 'rb') as f:
-            return base64.b64encode(f.read()).decode()
-    except FileNotFoundError:
-        return None
-
-# Cookie management functions using localStorage (more reliable with Streamlit)
-def set_auth_cookie(value, days=30):
-    """Set authentication cookie using JavaScript"""
-    js_code = f"""
-    <script>
-        localStorage.setItem('herd_ai_auth', '{value}');
-        // Also set a cookie for server-side persistence
-        const expiry = new Date();
-        expiry.setTime(expiry.getTime() + ({days} * 24 * 60 * 60 * 1000));
-        document.cookie = "herd_ai_auth={value}; expires=" + expiry.toUTCString() + "; path=/; SameSite=Lax";
-    </script>
-    """
-    html(js_code)
+from herd import agents, auth, events, images, loginpage, metrics, profiles, profiling, ratelimit, sessions, sidecar, slots, theme, warmup
+
+# Metrics and health endpoints, started once per process
+@st.cache_resource
+def start_sidecar():
+    return sidecar.start()
+
+# Assets, stylesheets, agents and secrets, built once per process and shared
+# by every session; herd.serve starts this before the first session arrives
+def app_state():
+    return warmup.warm()
+
+def asset_url(name):
+    """Cache-busted static URL for a file under assets/, or None if missing"""
+    return app_state().asset_url(name)
+
+def branding():
+    """Compiled branding of the show this session was opened for"""
+    state = app_state()
+    key = st.session_state.get("profile")
+    if key not in state.profiles:
+        key = st.session_state.profile = profiles.select(
+            state.profiles,
+            host=st.context.headers.get("Host"),
+            url=getattr(st.context, "url", None),
+            query=st.query_params.get(profiles.QUERY_PARAM),
+        )
+    return state.branding(key)
+
+# Usage events, written by a background thread so runs never wait on disk
+@st.cache_resource
+def event_log():
+    return events.EventLog.from_env()
+
+def track(event, **fields):
+    """Queue a usage event for the current session"""
+    log = event_log()
+    if log is not None:
+        log.emit(event, session=sessions.current_session_id(), **fields)
+
+# Conversation slots for the voice widget, shared by every session; None
+# when conversations are not capped
+@st.cache_resource
+def slot_broker():
+    return slots.SlotBroker.from_env(is_active=sessions.is_connected)
 
-def check_auth_cookie():
-    """Check if authentication cookie exists and redirect if authenticated"""
-    js_code = """
+def session_ended(session_id, info, reason):
+    if reason == "idle":
+        metrics.SESSION_EVICTIONS.inc()
+    broker = slot_broker()
+    if broker is not None:
+        broker.release(session_id, reason=reason)
+    log = event_log()
+    if log is not None:
+        log.emit("session_end", session=session_id, reason=reason,
+                 duration=round(info.last_seen - info.started, 1))
+
+# Admission control and idle eviction for all sessions in this process
+@st.cache_resource
+def session_manager():
+    return sessions.SessionManager.from_env(on_end=session_ended).start()
+
+# Shared across sessions and the static login page so limits apply per
+# client, not per tab
+def login_limiter():
+    return ratelimit.shared_limiter()
+
+# Element helpers that record payload sizes for the metrics endpoint
+def markdown(body, element="markdown"):
+    """st.markdown with HTML allowed"""
+    metrics.record_bytes(element, body)
+    st.markdown(body, unsafe_allow_html=True)
+
+def component(body, height, element="html"):
+    """Render body in a components.html iframe"""
+    metrics.record_bytes(element, body)
+    html(body, height=height)
+
+def profiled(scope):
+    """cProfile the run when an operator asked for it; see herd.profiling"""
+    enabled = profiling.requested(st.query_params.get(profiling.QUERY_PARAM))
+    return profiling.capture_if(enabled, sessions.current_session_id(), scope)
+
+def fragment(name, run_every=None):
+    """st.fragment whose own reruns are timed under scope name and count as
+    session activity; inside a full run it renders like a plain function"""
+    def decorate(func):
+        @st.fragment(run_every=run_every)
+        @functools.wraps(func)
+        def run(*args, **kwargs):
+            if metrics.in_rerun():
+                return func(*args, **kwargs)
+            with metrics.rerun(scope=name), profiled(name):
+                if not session_manager().admit(sessions.current_session_id(), st.session_state):
+                    st.rerun()  # evicted meanwhile; the full run shows the capacity page
+                return func(*args, **kwargs)
+        return run
+    return decorate
+
+# Cookie management functions; the server verifies the signed cookie itself
+def set_auth_cookie(token, max_age):
+    """Set the signed authentication cookie using JavaScript"""
+    js_code = f"""
     <script>
-        // Check localStorage first
-        const authValue = localStorage.getItem('herd_ai_auth');
-        if (authValue === 'authenticated') {
-            // Redirect with authentication parameter
-            const url = new URL(window.location);
-            url.searchParams.set('authenticated', 'true');
-            window.location.href = url.toString();
-        } else {
-            // Check cookie as backup
-            const cookies = document.cookie.split(';');
-            for (let cookie of cookies) {
-                const [name, value] = cookie.trim().split('=');
-                if (name === 'herd_ai_auth' && value === 'authenticated') {
-                    const url = new URL(window.location);
-                    url.searchParams.set('authenticated', 'true');
-                    window.location.href = url.toString();
-                    break;
-                }
-            }
-        }
+        const secure = window.location.protocol === 'https:' ? '; Secure' : '';
+        document.cookie = "{auth.COOKIE_NAME}={token}; max-age={max_age}; path=/; SameSite=Lax" + secure;
     </script>
     """
-    html(js_code)
+    component(js_code, height=0, element="cookie")
 
 def clear_auth_cookie():
     """Clear authentication cookie using JavaScript"""
-    js_code = """
+    js_code = f"""
     <script>
-        localStorage.removeItem('herd_ai_auth');
-        document.cookie = "herd_ai_auth=; expires=Thu, 01 Jan 1970 00:00:00 UTC; path=/;";
+        document.cookie = "{auth.COOKIE_NAME}=; max-age=0; path=/;";
     </script>
     """
-    html(js_code)
+    component(js_code, height=0, element="cookie")
 
-# Page config
-st.set_page_config(
-    page_title="Herd AI",
-    page_icon="🦊",
-    layout="centered",
-    initial_sidebar_state="collapsed"
-)
+def render_at_capacity(title, retry_seconds=15):
+    """Minimal page for sessions turned away; reloads itself to try again"""
+    markdown(f"""
+    <div style="text-align: center; margin-top: 30vh; font-size: 1.3rem;">
+        {html_text.escape(title)} is at capacity right now. Retrying in {retry_seconds} seconds…
+    </div>
+    """, element="capacity")
+    component(f"""
+    <script>setTimeout(() => window.parent.location.reload(), {retry_seconds * 1000});</script>
+    """, height=0, element="capacity")
 
-# Initialize session state
-if 'authenticated' not in st.session_state:
-    st.session_state.authenticated = False
-
-# Check for authentication cookie/localStorage on first load
-if not st.session_state.authenticated:
-    check_auth_cookie()
-    # Check for authentication query parameter
-    query_params = st.query_params
-    if query_params.get('authenticated') == 'true':
-        st.session_state.authenticated = True
-        # Clear the query param to clean up the URL
-        st.query_params.clear()
-
-# Get base64 encoded images
-bg_image = get_base64_of_bin_file(Path(__file__).parent / "assets/TheHerd_Final_wide.png")
-logo_image = get_base64_of_bin_file(Path(__file__).parent / "assets/fox-sports.jpg")
-login_bg_image = get_base64_of_bin_file(Path(__file__).parent / "assets/TheHerd_Final_wide.png")
-
-# Get base64 encoded fonts
-font_light = get_base64_of_bin_file(Path(__file__).parent / "assets/fonts/industry-font/IndustryTest-Light.otf")
-font_book = get_base64_of_bin_file(Path(__file__).parent / "assets/fonts/industry-font/IndustryTest-Book.otf")
-font_medium = get_base64_of_bin_file(Path(__file__).parent / "assets/fonts/industry-font/IndustryTest-Medium.otf")
-font_demi = get_base64_of_bin_file(Path(__file__).parent / "assets/fonts/industry-font/IndustryTest-Demi.otf")
-
-# Consolidated CSS - Fixed visual issues and reduced redundancy
-st.markdown(f"""
-<style>
-    /* Font Face Declarations */
-    @font-face {{
-        font-family: 'Industry';
-        font-weight: 300;
-        font-style: normal;
-        src: url(data:font/otf;base64,{font_light}) format('opentype');
-    }}
-    
-    @font-face {{
-        font-family: 'Industry';
-        font-weight: 400;
-        font-style: normal;
-        src: url(data:font/otf;base64,{font_book}) format('opentype');
-    }}
-    
-    @font-face {{
-        font-family: 'Industry';
-        font-weight: 500;
-        font-style: normal;
-        src: url(data:font/otf;base64,{font_medium}) format('opentype');
-    }}
-    
-    @font-face {{
-        font-family: 'Industry';
-        font-weight: 600;
-        font-style: normal;
-        src: url(data:font/otf;base64,{font_demi}) format('opentype');
-    }}
-    
-    /* Global font settings */
-    * {{
-        font-family: 'Industry', -apple-system, BlinkMacSystemFont, 'Segoe UI', sans-serif !important;
-    }}
-    
-    body {{
-        font-family: 'Industry', -apple-system, BlinkMacSystemFont, 'Segoe UI', sans-serif !important;
-        font-weight: 400;
-    }}
-    
-    /* Hide Streamlit elements */
-    #MainMenu, footer, header, .stDeployButton {{visibility: hidden;}}
-    
-    /* Background styling - simplified */
-    .stApp {{
-        background: {f'linear-gradient(rgba(0,21,41,0.85), rgba(0,0,0,0.95)), url("data:image/png;base64,{bg_image}") center/cover fixed' if st.session_state.authenticated and bg_image else f'linear-gradient(rgba(0,21,41,0.3), rgba(0,0,0,0.4)), url("data:image/png;base64,{login_bg_image}") center/cover fixed' if login_bg_image else 'linear-gradient(rgba(0,21,41,0.95), rgba(0,0,0,0.98))'};
-    }}
-    
-    /* Headers - Polished typography */
-    h1 {{
-        background: {'linear-gradient(135deg, #FFFFFF 0%, #E0E0E0 100%)' if st.session_state.authenticated else '#FFFFFF'};
-        -webkit-background-clip: text;
-        -webkit-text-fill-color: transparent;
-        background-clip: text;
-        font-family: 'Industry', -apple-system, BlinkMacSystemFont, 'Segoe UI', sans-serif;
-        font-weight: 600;
-        text-align: center;
-        font-size: clamp(3.5rem, 5vw, 4.5rem);
-        margin-bottom: 1rem;
-        letter-spacing: 0.1em;
-        line-height: 1.2;
-        position: relative;
-        padding-bottom: 0.5rem;
-        filter: drop-shadow(0 3px 6px rgba(0, 0, 0, 0.8));
-        transition: all 0.3s ease;
-    }}
+def render_expired(title):
+    """Shown to a browser whose idle session was closed; it reconnects here"""
+    markdown(f"""
+    <div style="text-align: center; margin-top: 30vh; font-size: 1.3rem;">
+        Your {html_text.escape(title)} session ended after a period of inactivity.
+    </div>
+    """, element="expired")
+    if st.button("Continue", use_container_width=True):
+        del st.query_params[sessions.EXPIRED_PARAM]
+        st.rerun()
 
-    
-    /* Hover effect for h1 */
-    h1:hover {{
-        transform: scale(1.02);
-        filter: drop-shadow(0 4px 6px rgba(0, 0, 0, 0.8));
-    }}
-    
-    /* Subtle underline accent */
-    h1::after {{
-        content: '';
-        position: absolute;
-        bottom: 0;
-        left: 50%;
-        transform: translateX(-50%);
-        width: 80px;
-        height: 2px;
-        background: {'linear-gradient(90deg, #FFFFFF, #E0E0E0)' if st.session_state.authenticated else '#FFFFFF'};
-        border-radius: 2px;
-        opacity: {'0.6' if st.session_state.authenticated else '1'};
-    }}
-    
-    /* Login container - REMOVED - form elements now appear directly on background */
-    
-    /* Button styling */
-    .stButton > button {{
-        background: linear-gradient(135deg, #0084FF 0%, #0066CC 100%);
-        color: white;
-        border: none;
-        padding: 1.2rem 4rem;
-        font-weight: 600;
-        border-radius: 10px;
-        text-transform: uppercase;
-        transition: all 0.3s ease;
-        font-family: 'Industry', -apple-system, BlinkMacSystemFont, 'Segoe UI', sans-serif;
-        letter-spacing: 0.12em;
-        font-size: 1.3rem;
-        box-shadow: 0 6px 20px rgba(0, 0, 0, 0.5);
-    }}
-    
-    .stButton > button:hover {{
-        background: linear-gradient(135deg, #0066CC 0%, #0052A3 100%);
-        transform: translateY(-2px);
-        box-shadow: 0 8px 25px rgba(0, 0, 0, 0.6);
-    }}
-    
-    /* Input field styling */
-    .stTextInput > div > div > input {{
-        border-radius: 10px !important;
-        border: 2px solid rgba(255, 255, 255, 0.4) !important;
-        padding: 1.2rem 1.5rem !important;
-        background: rgba(255, 255, 255, 0.9) !important;
-        color: #000000 !important;
-        font-family: 'Industry', -apple-system, BlinkMacSystemFont, 'Segoe UI', sans-serif !important;
-        font-size: 1.2rem !important;
-        font-weight: 500 !important;
-        letter-spacing: 0.04em !important;
-        transition: all 0.3s ease !important;
-        backdrop-filter: blur(20px) !important;
-        box-shadow: 0 8px 32px rgba(0, 0, 0, 0.3) !important;
-        -webkit-text-fill-color: #000000 !important;
-    }}
-    
-    .stTextInput > div > div > input:focus {{
-        border-color: rgba(0, 132, 255, 0.8) !important;
-        outline: none !important;
-        background: rgba(255, 255, 255, 1) !important;
-        box-shadow: 0 0 0 3px rgba(0, 132, 255, 0.3), 0 8px 32px rgba(0, 0, 0, 0.4) !important;
-    }}
-    
-    .stTextInput > div > div > input::placeholder {{
-        color: rgba(0, 0, 0, 0.5) !important;
-        font-family: 'Industry', -apple-system, BlinkMacSystemFont, 'Segoe UI', sans-serif !important;
-        font-weight: 400 !important;
-        -webkit-text-fill-color: rgba(0, 0, 0, 0.5) !important;
-    }}
-    
-    /* Input field wrapper */
-    .stTextInput > div {{
-        background: transparent !important;
-        position: relative !important;
-    }}
-    
-    /* Password visibility toggle button */
-    .stTextInput > div > div > button {{
-        background: transparent !important;
-        border: none !important;
-        color: rgba(0, 0, 0, 0.6) !important;
-        right: 1rem !important;
-        position: absolute !important;
-        top: 50% !important;
-        transform: translateY(-50%) !important;
-    }}
-    
-    .stTextInput > div > div > button:hover {{
-        color: rgba(0, 0, 0, 0.9) !important;
-    }}
-    
-    /* Footer - improved contrast */
-    .footer {{
-        position: fixed;
-        bottom: 0;
-        left: 0;
-        right: 0;
-        background: {'rgba(0, 21, 41, 0.9)' if st.session_state.authenticated else 'transparent'};
-        backdrop-filter: blur(10px);
-        padding: 1rem 0;
-        text-align: center;
-        color: {'rgba(255,255,255,0.9)' if st.session_state.authenticated else 'rgba(255,255,255,0.9)'};
-        font-size: 1rem;
-        font-family: 'Industry', -apple-system, BlinkMacSystemFont, 'Segoe UI', sans-serif;
-        letter-spacing: 0.03em;
-        border-top: {'1px solid rgba(255, 255, 255, 0.1)' if st.session_state.authenticated else 'none'};
-        z-index: 100;
-    }}
-    
-    /* Fixed footer for login page */
-    .login-footer {{
-        position: fixed;
-        bottom: 0;
-        left: 0;
-        right: 0;
-        background: transparent;
-        padding: 1.5rem 0;
-        text-align: center;
-        color: rgba(255,255,255,1);
-        font-size: 1rem;
-        font-weight: 500;
-        font-family: 'Industry', -apple-system, BlinkMacSystemFont, 'Segoe UI', sans-serif;
-        letter-spacing: 0.03em;
-        z-index: 100;
-        text-shadow: 0 2px 6px rgba(0, 0, 0, 1), 0 0 20px rgba(0, 0, 0, 0.8);
-    }}
-    
-    .login-footer span {{
-        font-size: 0.9rem;
-        opacity: 0.9;
-    }}
-    
-    /* Authenticated view styling */
-    .main-header {{
-        text-align: center;
-        margin-bottom: 0.25rem;
-    }}
-    
-    .main-header img {{
-        margin: 0.25rem 0;
-        width: 120px;
-    }}
-    
-    .widget-container {{
-        display: flex;
-        justify-content: center;
-        align-items: center;
-        width: 100%;
-        padding: 1rem 0;
-    }}
-    
-    /* Error message styling */
-    .stAlert {{
-        background: rgba(255, 68, 68, 0.2);
-        border: 2px solid rgba(255, 68, 68, 0.5);
-        border-radius: 10px;
-        color: rgba(255, 255, 255, 1);
-        font-family: 'Industry', -apple-system, BlinkMacSystemFont, 'Segoe UI', sans-serif;
-        backdrop-filter: blur(12px);
-        box-shadow: 0 4px 20px rgba(0, 0, 0, 0.5);
-        max-width: 500px;
-        margin: 1rem auto 0 auto;
-    }}
-    
-    /* Form container styling */
-    .stForm {{
-        background: transparent;
-        max-width: 500px;
-        margin: 0 auto;
-    }}
-    
-    /* Hide default form help text */
-    .stForm > div[data-testid="stFormSubmitButton"] > div > div > small {{
-        display: none !important;
-    }}
-    
-    /* Form submit area */
-    .stForm [data-testid="stFormSubmitButton"] {{
-        margin-top: 0 !important;
-    }}
-    
-    /* Additional button icon removal */
-    .stButton > button > div {{
-        display: flex;
-        justify-content: center;
-        align-items: center;
-    }}
-    
+# Failed attempts rerun only this fragment; the title, stylesheet and footer stay
+@fragment("login_form")
+def login_form():
+    """Password form; a successful login reruns the whole app"""
+    with st.form("login_form", clear_on_submit=False):
+        copy = branding().profile.copy
+        password = st.text_input("Password", type="password", placeholder=copy["password_placeholder"],
+                                 label_visibility="collapsed")
+        
+        markdown('<div style="margin-top: 1.5rem;"></div>')
+        
+        submitted = st.form_submit_button(copy["login_button"], use_container_width=True)
+
+        if submitted:
+            allowed, wait = login_limiter().attempt(ratelimit.client_key())
+            if not allowed:
+                metrics.LOGIN_FAILURES.inc(reason="throttled")
+                track("login", outcome="throttled")
+                st.session_state.throttled_until = time.time() + wait
+                st.rerun()
 
-    /* Add padding to bottom when footer is fixed */
-    .main > div {{
-        padding-bottom: {'1rem' if st.session_state.authenticated else '6rem'};
-    }}
-</style>
-""", unsafe_allow_html=True)
+        if submitted and auth.verify_password(password, app_state().password_hash):
+            metrics.LOGINS.inc()
+            track("login", outcome="success", method="password")
+            st.session_state.authenticated = True
+            # Issued from the authenticated view, which survives the rerun
+            st.session_state.issue_auth_cookie = True
+            st.rerun()
+        elif submitted:
+            metrics.LOGIN_FAILURES.inc(reason="password")
+            track("login", outcome="password")
+            st.error(copy["password_error"])
 
-# Authentication check
-if not st.session_state.authenticated:
-    # Login page
+def render_login():
+    """Password form and footer for unauthenticated sessions"""
+    brand = branding()
     col1, col2, col3 = st.columns([0.5, 4, 0.5])
     
     with col2:
         # Add spacing at top
-        st.markdown('<div style="margin-top: 2rem;"></div>', unsafe_allow_html=True)
+        markdown('<div style="margin-top: 2rem;"></div>')
         
-        # Title without box
-        st.markdown("""
-        <h2 style="color: white; font-size: 3.5rem; font-weight: 600; 
-                   letter-spacing: 0.12em; text-shadow: 0 4px 8px rgba(0, 0, 0, 1); 
-                   font-family: 'Industry', -apple-system, BlinkMacSystemFont, 'Segoe UI', sans-serif; 
-                   text-transform: uppercase; text-align: center; margin-bottom: 2rem;">
-            HERD AI
-        </h2>
-        """, unsafe_allow_html=True)
+        # Title without box, shared with the static login page
+        markdown(loginpage.login_title(brand.profile))
         
-        # Form without container
-        with st.form("login_form", clear_on_submit=False):
-            password = st.text_input("Password", type="password", placeholder="Enter password", label_visibility="collapsed")
-            
-            st.markdown('<div style="margin-top: 1.5rem;"></div>', unsafe_allow_html=True)
-            
-            submitted = st.form_submit_button("▸ LOGIN", use_container_width=True)
-
-            if submitted and password == "fsworldcup2026":
-                st.session_state.authenticated = True
-                set_auth_cookie("authenticated", days=30)  # Cookie expires in 30 days
-                st.rerun()
-            elif submitted:
-                st.error("❌ Incorrect password. Please try again.")
+        login_form()
         
+    # Warm the agent view: its stylesheet is already compiled with this one,
+    # the hints preconnect to the widget origins and prefetch its assets
+    component(brand.warmup_html, height=0, element="warmup")
+
     # Footer - pinned to bottom
-    st.markdown("""
-    <div class="login-footer">
-        © 2025 Fox Sports. All rights reserved.<br>
-        <span>FIFA World Cup 2026™ Official Broadcaster</span>
-    </div>
-    """, unsafe_allow_html=True)
+    markdown(loginpage.login_footer(brand.profile))
 
-else:
-    # Authenticated view
+# Interactions inside the agent list rerun only this fragment
+@fragment("agents")
+def agent_widgets():
+    """Title, description and ElevenLabs widget for each configured agent;
+    with conversations capped, a widget is only mounted once a slot is granted"""
+    script_src, integrity = app_state().widget_script
+    broker = slot_broker()
+    ticket = broker.poll(sessions.current_session_id()) if broker else None
+    if ticket is not None:
+        st.session_state.conversation = ticket.status
+    for agent in branding().agents.values():
+        markdown(f"### {agent.title}")
+        markdown(f"*{agent.description}*")
+        with metrics.span("widget"):
+            if ticket is None or (ticket.status == "granted" and ticket.agent == agent.key):
+                shown = st.session_state.setdefault("widget_placeholders", set())
+                if agent.key not in shown:
+                    shown.add(agent.key)
+                    metrics.WIDGET_PLACEHOLDERS.inc(agent=agent.key)
+                    track("widget_placeholder", agent=agent.key)
+                widget_html = agents.widget_html(agent, script_src, integrity, autostart=ticket is not None)
+                component(widget_html, height=agents.WIDGET_HEIGHT, element="widget")
+            if ticket is None:
+                continue
+            if ticket.agent == agent.key:
+                conversation_status(agent)
+            elif ticket.status != "none":
+                st.caption("Available once your current conversation ends.")
+            elif st.button(f"▸ Talk to {agent.name}", key=f"talk_{agent.key}"):
+                broker.request(sessions.current_session_id(), agent.key)
+                track("conversation_request", agent=agent.key)
+                st.rerun()
+
+def wait_text(seconds):
+    return "under a minute" if seconds < 60 else f"about {math.ceil(seconds / 60)} min"
+
+@fragment("conversation", run_every=slots.POLL_INTERVAL)
+def conversation_status(agent):
+    """Queue position, or the button that ends the conversation. Polling keeps
+    the slot's lease fresh; the app reruns when the slot is granted or lost"""
+    broker = slot_broker()
+    session_id = sessions.current_session_id()
+    ticket = broker.poll(session_id)
+    if ticket.status != st.session_state.get("conversation"):
+        track("conversation_status", agent=agent.key, status=ticket.status)
+        st.rerun()
+    if ticket.status == "waiting":
+        st.info(f"You're number {ticket.position} in line to talk to {agent.name}. "
+                f"Estimated wait: {wait_text(ticket.eta)}.")
+    label = "Leave the queue" if ticket.status == "waiting" else "■ End conversation"
+    if st.button(label, key=f"end_{agent.key}"):
+        broker.release(session_id)
+        track("conversation_end", agent=agent.key, status=ticket.status)
+        st.rerun()
+
+def render_agent_view():
+    """Logo, header and the ElevenLabs widget for authenticated sessions"""
+    state = app_state()
+    if st.session_state.pop("issue_auth_cookie", False):
+        set_auth_cookie(auth.sign_token(state.auth_secret, ttl=state.cookie_ttl), max_age=state.cookie_ttl)
 
-    # Fox Sports logo in top right
+    profile = branding().profile
+
+    # Show logo in top right
+    logo_image = asset_url(profile.logo)
     if logo_image:
-        st.markdown(f"""
+        logo_variants = images.variants(state.image_manifest, profile.logo)
+        logo_srcset = images.srcset(logo_variants, state.urls, 100) if logo_variants else ""
+        markdown(f"""
         <div style="position: fixed; top: 1rem; right: 1rem; z-index: 100;">
-            <img src="data:image/jpeg;base64,{logo_image}" style="width: 100px; opacity: 0.9; filter: drop-shadow(0 2px 4px rgba(0,0,0,0.5));">
+            <img src="{logo_image}" srcset="{logo_srcset}" style="width: 100px; opacity: 0.9; filter: drop-shadow(0 2px 4px rgba(0,0,0,0.5));">
         </div>
-        """, unsafe_allow_html=True)
+        """)
     
     # Main header
-    st.markdown("""
+    markdown(f"""
     <div class="main-header">
-        <h1>Herd AI</h1>
+        <h1>{html_text.escape(profile.title)}</h1>
     </div>
-    """, unsafe_allow_html=True)
-    
-    # Container for multiple widgets with custom styling
-    st.markdown("""
-    <style>
-        /* Main content area optimization */
-        .stApp > div {
-            padding-bottom: 6rem !important;
-        }
-        
-        /* Container max width for better full-screen layout */
-        .main .block-container {
-            max-width: 1600px !important;
-            padding-left: 3rem !important;
-            padding-right: 3rem !important;
-            padding-top: 0.5rem !important;
-        }
-        
-        /* Optimize main content padding */
-        .main > div {
-            padding-top: 0.5rem !important;
-        }
-        
-        /* Make markdown headers visible with improved sizing */
-        h3 {
-            color: #FFFFFF !important;
-            font-size: 1.8rem !important;
-            font-weight: 600 !important;
-            margin-bottom: 0.5rem !important;
-            margin-top: 0 !important;
-            padding-top: 0 !important;
-            text-shadow: 0 2px 6px rgba(0, 0, 0, 0.9) !important;
-            transition: all 0.3s ease !important;
-            cursor: default !important;
-            position: relative !important;
-            display: inline-block !important;
-            font-family: 'Industry', -apple-system, BlinkMacSystemFont, 'Segoe UI', sans-serif !important;
-            letter-spacing: 0.05em !important;
-            white-space: nowrap !important;
-        }
-        
-        /* Hover effect for extra polish */
-        h3:hover {
-            transform: translateY(-1px) !important;
-            text-shadow: 0 3px 8px rgba(0, 0, 0, 1) !important;
-        }
-        
-        /* Make italic descriptions visible with better sizing */
-        p em {
-            color: rgba(255, 255, 255, 0.9) !important;
-            font-style: normal !important;
-            font-size: 1.2rem !important;
-            display: block;
-            margin-bottom: 1.2rem;
-            margin-top: 0.2rem;
-            line-height: 1.4;
-            font-family: 'Industry', -apple-system, BlinkMacSystemFont, 'Segoe UI', sans-serif !important;
-            font-weight: 400 !important;
-            letter-spacing: 0.02em !important;
-            text-shadow: 0 1px 4px rgba(0, 0, 0, 0.8) !important;
-        }
-        
-        /* Hide horizontal rule dividers */
-        hr {
-            display: none !important;
-        }
-        
-        /* Remove Streamlit default spacing */
-        .element-container {
-            margin: 0 !important;
-            padding: 0 !important;
-        }
-        
-        .stMarkdown {
-            margin: 0 !important;
-            padding: 0 !important;
-        }
-        
-        .stMarkdown p {
-            margin: 0 !important;
-            padding: 0 !important;
-        }
-        
-        /* Optimize iframe container for full-screen experience */
-        iframe {
-            margin: 0 !important;
-            padding: 0 !important;
-            display: block !important;
-            border-radius: 12px !important;
-        }
-        
-        .stComponent {
-            margin: 0 !important;
-            padding: 0 !important;
-        }
-        
-        /* Tight spacing for widget sections */
-        div[data-testid="stVerticalBlock"] > div {
-            gap: 0 !important;
-        }
-        
-        /* Widget container with better styling */
-        div[data-testid="stVerticalBlock"] {
-            background: rgba(0, 33, 66, 0.5) !important;
-            border-radius: 16px !important;
-            border: 1px solid rgba(255, 255, 255, 0.2) !important;
-            backdrop-filter: blur(8px) !important;
-            padding: 2.5rem 3rem !important;
-            box-shadow: 0 8px 32px rgba(0, 0, 0, 0.5) !important;
-            max-width: 1500px !important;
-            margin: 0 auto !important;
-        }
-        
-        /* Center align content */
-        div[data-testid="stVerticalBlock"] > div > div {
-            text-align: center;
-        }
-        
-        /* Responsive design for smaller screens */
-        @media (max-width: 1024px) {
-            .main .block-container {
-                padding-left: 1.5rem !important;
-                padding-right: 1.5rem !important;
-            }
-            
-            div[data-testid="stVerticalBlock"] {
-                padding: 1.5rem !important;
-            }
-            
-            h3 {
-                font-size: 1.5rem !important;
-            }
-            
-            p em {
-                font-size: 1rem !important;
-            }
-            
-            h1 {
-                font-size: clamp(2.5rem, 4vw, 3.5rem) !important;
-            }
-        }
-        
-        /* Extra large screens optimization */
-        @media (min-width: 1920px) {
-            .main .block-container {
-                max-width: 1800px !important;
-            }
-            
-            div[data-testid="stVerticalBlock"] {
-                max-width: 1700px !important;
-            }
-        }
-    </style>
-    """, unsafe_allow_html=True)
+    """)
     
-    # Container for widgets with max width
-    container = st.container()
-    
-    with container:
-        # Single widget centered
-        st.markdown("### Colin Cowherd AI Sports Agent")
-        st.markdown("*Your intelligent companion for FIFA World Cup 2026™ insights, powered by Colin Cowherd's voice*")
-        widget_html = """
-        <elevenlabs-convai agent-id="agent_6601k4zk42ebeagrspzca4mvebn8"></elevenlabs-convai>
-        <script src="https://unpkg.com/@elevenlabs/convai-widget-embed" async type="text/javascript"></script>
-        """
-        html(widget_html, height=700)
-        
+    agent_widgets()
 
-    
-    st.markdown("""
+    markdown(f"""
     <p class="footer">
-        © 2025 Fox Sports • FIFA World Cup 2026™ Official Broadcaster<br>
-        <small>Powered by ElevenLabs AI Technology</small>
+        {html_text.escape(profile.footer[0])}<br>
+        <small>{html_text.escape(profile.footer[1])}</small>
     </p>
-    """, unsafe_allow_html=True)
\ No newline at end of file
+    """)
+
+# Page config
+profile = branding().profile
+st.set_page_config(
+    page_title=profile.title,
+    page_icon=profile.page_icon,
+    layout="centered",
+    initial_sidebar_state="collapsed"
+)
+
+start_sidecar()
+
+with metrics.rerun(), profiled("app"):
+    if sessions.EXPIRED_PARAM in st.query_params:
+        render_expired(profile.title)
+        st.stop()
+
+    with metrics.span("admission"):
+        manager = session_manager()
+        admitted = manager.admit(sessions.current_session_id(), st.session_state,
+                                 query_string=urlencode(st.query_params.to_dict()))
+        stats = manager.stats()
+        metrics.ACTIVE_SESSIONS.set(stats["sessions"])
+        metrics.SESSION_MEMORY.set(stats["memory_bytes"])
+    if not admitted:
+        metrics.SESSIONS_REJECTED.inc()
+        render_at_capacity(profile.title)
+        st.stop()
+
+    with metrics.span("auth"):
+        # Initialize session state
+        if 'authenticated' not in st.session_state:
+            st.session_state.authenticated = False
+            metrics.SESSIONS.inc()
+            track("session_start")
+
+        # Returning users: verify the signed cookie sent with the websocket handshake
+        if not st.session_state.authenticated and auth.verify_token(app_state().auth_secret, auth.request_token()):
+            st.session_state.authenticated = True
+            track("login", outcome="success", method="cookie")
+
+    # With a static login page deployed, anonymous sessions only redirect to it
+    if not st.session_state.authenticated and loginpage.login_url():
+        component(f"<script>window.parent.location.replace({json.dumps(loginpage.login_url())});</script>",
+                  height=0, element="redirect")
+        st.stop()
+
+    # Throttled clients get a bare rejection page instead of the full render
+    retry_in = st.session_state.get("throttled_until", 0) - time.time()
+    if not st.session_state.authenticated and retry_in > 0:
+        st.error(profile.copy["throttle_error"].format(seconds=int(retry_in) + 1))
+        st.button("Try again")
+        st.stop()
+
+    # Stylesheet for the current view, compiled once per profile
+    with metrics.span("assets"):
+        bundles = branding().bundles
+    with metrics.span("css"):
+        view = "authenticated" if st.session_state.authenticated else "login"
+        markdown(bundles[view], element="stylesheet")
+        # The lite-mode class lives on the page itself, so probing once per
+        # session is enough
+        if "lite_probed" not in st.session_state:
+            st.session_state.lite_probed = True
+            component(theme.LITE_PROBE, height=0, element="lite_probe")
+
+    if not st.session_state.authenticated:
+        with metrics.span("login"):
+            render_login()
+    else:
+        with metrics.span("agent_view"):
+            render_agent_view()
@@ -0,0 +1,13 @@
+// Offline stand-in for @elevenlabs/convai-widget-embed.
+// Defines <elevenlabs-convai> as a static card showing the agent ID so the
+// vendoring, benchmarks and load tests never contact ElevenLabs.
+(function () {
+  if (customElements.get('elevenlabs-convai')) return;
+  customElements.define('elevenlabs-convai', class extends HTMLElement {
+    connectedCallback() {
+      const agent = this.getAttribute('agent-id') || 'unknown';
+      this.textContent = 'Stand-in convai widget for ' + agent;
+      this.setAttribute('data-standin', 'true');
+    }
+  });
+})();
@@ -0,0 +1,408 @@
+"""Concurrent-session load and soak harness against a local Streamlit server.
+
+Starts ``python -m herd.serve`` with the widget bundle swapped for the
+offline stand-in in ``benchmarks/fixtures``. It then opens concurrent
+websocket clients that speak Streamlit's protocol. Each client:
+
+1. loads the login page;
+2. submits the password through the ``login_form`` fragment and waits for
+   the agent view;
+3. with ``--conversations N``, clicks "Talk to" and records whether it was
+   granted one of the N conversation slots or queued;
+4. reruns the agent view ``--reruns`` times;
+5. stays connected and idle for ``--hold`` seconds, then disconnects.
+
+This is repeated for ``--waves`` waves. The report covers:
+
+- p50/p99 latency from sending a rerun request to ``script_finished``,
+  per step;
+- bytes received per session;
+- server RSS sampled over time and after each wave;
+- conversations granted and queued, failing the run if a wave was granted
+  more than N.
+
+RSS that keeps growing from wave to wave by more than ``--leak-mib``
+counts as a suspected leak. Run it with::
+
+    pip install -r requirements-bench.txt
+    python -m benchmarks.load --sessions 100 --hold 60
+    python -m benchmarks.load --sessions 20 --waves 1 --conversations 5
+    python -m benchmarks.load --url http://127.0.0.1:8501 --pid 1234   # existing server
+
+Clients connect from 127.0.0.1, which the login limiter treats as a local
+proxy: only its global bucket applies, which the default ramp stays under.
+
+Clients do not execute JavaScript, so iframes and the widget itself are
+not loaded; the server cost they measure is the script runs and deltas.
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+FIXTURE = Path(__file__).resolve().parent / "fixtures" / "convai-widget-embed.js"
+AUTHENTICATED_MARKER = b'<div class="main-header">'
+THROTTLED_MARKER = b"Too many login attempts"
+WIDGET_MARKER = b"elevenlabs-convai"
+QUEUED_MARKER = b"in line to talk"
+TALK_LABEL = "▸ Talk to"
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of values, or None when there are none"""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, round(fraction * len(ordered)) - 1))]
+
+
+def rss_bytes(pid):
+    """Resident set size of pid from /proc, falling back to ps"""
+    try:
+        with open(f"/proc/{pid}/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except FileNotFoundError:
+        pass
+    output = subprocess.run(["ps", "-o", "rss=", "-p", str(pid)], capture_output=True, text=True)
+    return int(output.stdout.strip() or 0) * 1024
+
+
+class Server:
+    """The app under test in a subprocess, with the stand-in widget vendored"""
+
+    def __init__(self, port, sidecar_port, max_sessions, max_conversations=0):
+        self.port = port
+        self.sidecar_port = sidecar_port
+        self.public_port = _free_port()
+        self.url = f"http://127.0.0.1:{port}"
+        self._tmp = tempfile.TemporaryDirectory(prefix="herd-load-")
+        vendor_dir = Path(self._tmp.name) / "vendor"
+        env = dict(
+            os.environ,
+            HERD_SIDECAR_PORT=str(sidecar_port),
+            HERD_PUBLIC_PORT=str(self.public_port),
+            # Vendored outside static/, so served from the public sidecar listener
+            HERD_VENDOR_DIR=str(vendor_dir),
+            HERD_VENDOR_URL=f"http://127.0.0.1:{self.public_port}",
+            HERD_MAX_SESSIONS=str(max_sessions),
+            HERD_MAX_CONVERSATIONS=str(max_conversations),
+            HERD_EVENT_LOG=str(Path(self._tmp.name) / "events.jsonl"),
+            STREAMLIT_BROWSER_GATHER_USAGE_STATS="false",
+        )
+        env.setdefault("HERD_AUTH_SECRET", "load-test")
+        subprocess.run(
+            [sys.executable, "-m", "herd.vendor", "--version", "0.0.0-fixture", "--source", str(FIXTURE)],
+            cwd=ROOT, env=env, check=True, capture_output=True,
+        )
+        self.started = time.monotonic()
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "herd.serve", f"--server.port={port}", "--server.headless=true",
+             "--server.fileWatcherType=none", "--server.runOnSave=false"],
+            cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        self.pid = self.process.pid
+
+    def wait_ready(self, timeout=60):
+        deadline = time.monotonic() + timeout
+        for url in (f"http://127.0.0.1:{self.sidecar_port}/ready", f"{self.url}/_stcore/health"):
+            while True:
+                if self.process.poll() is not None:
+                    raise RuntimeError(f"server exited with {self.process.returncode}")
+                try:
+                    with urllib.request.urlopen(url, timeout=2):
+                        break
+                except OSError:
+                    if time.monotonic() > deadline:
+                        raise RuntimeError(f"{url} not ready after {timeout}s")
+                    time.sleep(0.25)
+
+    def stop(self):
+        self.process.terminate()
+        try:
+            self.process.wait(10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+        self._tmp.cleanup()
+
+
+class Client:
+    """One browser tab: a websocket session driven through the login flow"""
+
+    def __init__(self, index, url, password, wave=0, talk=False):
+        self.index = index
+        self.wave = wave
+        self.talk = talk
+        self.conversation = None
+        self.url = url.replace("http", "ws", 1).rstrip("/") + "/_stcore/stream"
+        self.password = password
+        self.bytes = 0
+        self.latencies = {}
+        self.error = None
+        self._ws = None
+        self._page_script_hash = ""
+        self._widgets = {}
+        self._fragment = ""
+        self._talk_fragment = ""
+        self._seen = b""
+
+    async def run(self, reruns, hold):
+        import websockets
+
+        try:
+            async with _connect(websockets, self.url, {}) as ws:
+                self._ws = ws
+                await self._rerun("initial")
+                await self._login()
+                if self.talk:
+                    await self._talk()
+                for _ in range(reruns):
+                    await self._rerun("rerun")
+                await asyncio.sleep(hold)
+        except Exception as exc:  # reported per session, never fatal to the run
+            self.error = f"{type(exc).__name__}: {exc}"
+
+    async def first_run(self):
+        """Open the session and wait for its first script run only"""
+        import websockets
+
+        async with _connect(websockets, self.url, {}) as ws:
+            self._ws = ws
+            await self._rerun("initial")
+
+    async def _login(self):
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        password = WidgetState(id=self._widgets["text_input"], string_value=self.password)
+        submit = WidgetState(id=self._widgets["submit"], trigger_value=True)
+        self._seen = b""
+        await self._rerun("login", [password, submit], fragment_id=self._fragment)
+        if THROTTLED_MARKER in self._seen:
+            raise RuntimeError("login throttled; lower the ramp rate")
+        if AUTHENTICATED_MARKER not in self._seen:
+            raise RuntimeError("login did not reach the agent view; set HERD_BENCH_PASSWORD")
+
+    async def _talk(self):
+        from streamlit.proto.WidgetStates_pb2 import WidgetState
+
+        if "talk" not in self._widgets:
+            raise RuntimeError("no Talk button; conversations are not capped on this server")
+        self._seen = b""
+        talk = WidgetState(id=self._widgets["talk"], trigger_value=True)
+        await self._rerun("talk", [talk], fragment_id=self._talk_fragment)
+        if WIDGET_MARKER in self._seen:
+            self.conversation = "granted"
+        elif QUEUED_MARKER in self._seen:
+            self.conversation = "queued"
+        else:
+            raise RuntimeError("Talk was neither granted nor queued")
+
+    async def _rerun(self, step, widgets=(), fragment_id=""):
+        from streamlit.proto.BackMsg_pb2 import BackMsg
+        from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+
+        message = BackMsg()
+        message.rerun_script.page_script_hash = self._page_script_hash
+        message.rerun_script.fragment_id = fragment_id
+        message.rerun_script.widget_states.widgets.extend(widgets)
+        start = time.perf_counter()
+        await self._ws.send(message.SerializeToString())
+        done = (ForwardMsg.FINISHED_SUCCESSFULLY, ForwardMsg.FINISHED_FRAGMENT_RUN_SUCCESSFULLY)
+        while True:
+            raw = await self._ws.recv()
+            self.bytes += len(raw)
+            self._seen += raw
+            forward = ForwardMsg()
+            forward.ParseFromString(raw)
+            kind = forward.WhichOneof("type")
+            if kind == "new_session":
+                self._page_script_hash = forward.new_session.page_script_hash
+            elif kind == "delta":
+                self._read_delta(forward.delta)
+            elif kind == "script_finished" and forward.script_finished in done:
+                self.latencies.setdefault(step, []).append(time.perf_counter() - start)
+                return
+
+    def _read_delta(self, delta):
+        if delta.WhichOneof("type") != "new_element":
+            return
+        element = delta.new_element
+        kind = element.WhichOneof("type")
+        if kind == "text_input":
+            self._widgets["text_input"] = element.text_input.id
+            self._fragment = delta.fragment_id
+        elif kind == "button" and element.button.is_form_submitter:
+            self._widgets["submit"] = element.button.id
+        elif kind == "button" and element.button.label.startswith(TALK_LABEL) and "talk" not in self._widgets:
+            self._widgets["talk"] = element.button.id
+            self._talk_fragment = delta.fragment_id
+
+
+def _connect(websockets, url, headers):
+    options = {"subprotocols": ["streamlit"], "max_size": None}
+    if int(websockets.__version__.split(".")[0]) >= 14:
+        return websockets.connect(url, additional_headers=headers, **options)
+    return websockets.connect(url, extra_headers=headers, **options)
+
+
+async def _sample_rss(pid, interval, samples, started):
+    while True:
+        samples.append((round(time.monotonic() - started, 1), rss_bytes(pid)))
+        await asyncio.sleep(interval)
+
+
+async def run_wave(url, sessions, ramp, reruns, hold, password, first_index, wave=0, talk=False):
+    clients = [Client(first_index + i, url, password, wave, talk) for i in range(sessions)]
+    delay = ramp / sessions if sessions else 0
+
+    async def start(client, index):
+        await asyncio.sleep(index * delay)
+        await client.run(reruns, hold)
+
+    await asyncio.gather(*(start(client, i) for i, client in enumerate(clients)))
+    return clients
+
+
+async def soak(args, url, pid):
+    started = time.monotonic()
+    samples, wave_rss, clients = [], [], []
+    sampler = asyncio.ensure_future(_sample_rss(pid, args.sample_interval, samples, started)) if pid else None
+    try:
+        for wave in range(args.waves):
+            clients += await run_wave(url, args.sessions, args.ramp, args.reruns, args.hold,
+                                      args.password, wave * args.sessions, wave, args.conversations > 0)
+            await asyncio.sleep(args.settle)
+            if pid:
+                wave_rss.append(rss_bytes(pid))
+    finally:
+        if sampler:
+            sampler.cancel()
+    return clients, samples, wave_rss
+
+
+def summarize(clients, samples, wave_rss, leak_mib, conversations=0):
+    steps = {}
+    for client in clients:
+        for step, values in client.latencies.items():
+            steps.setdefault(step, []).extend(values)
+    session_bytes = [c.bytes for c in clients if not c.error]
+    growth = [b - a for a, b in zip(wave_rss, wave_rss[1:])]
+    # The first wave fills caches and pools; later waves should not grow
+    leak = len(growth) > 1 and min(growth[1:]) > leak_mib * 1024 * 1024
+    granted = {}
+    for client in clients:
+        if client.conversation == "granted":
+            granted[client.wave] = granted.get(client.wave, 0) + 1
+    return {
+        "sessions": len(clients),
+        "errors": sorted({c.error for c in clients if c.error}),
+        "failed_sessions": sum(1 for c in clients if c.error),
+        "latency_ms": {
+            step: {"p50": round(percentile(values, 0.5) * 1000, 1),
+                   "p99": round(percentile(values, 0.99) * 1000, 1),
+                   "count": len(values)}
+            for step, values in steps.items()
+        },
+        "bytes_per_session": {
+            "mean": round(statistics.mean(session_bytes)) if session_bytes else None,
+            "max": max(session_bytes) if session_bytes else None,
+        },
+        "rss_mib": [(t, round(rss / 2 ** 20, 1)) for t, rss in samples],
+        "rss_after_wave_mib": [round(rss / 2 ** 20, 1) for rss in wave_rss],
+        "leak_suspected": leak,
+        "conversations": {
+            "granted": sum(granted.values()),
+            "queued": sum(1 for c in clients if c.conversation == "queued"),
+            "over_capacity": bool(conversations) and max(granted.values(), default=0) > conversations,
+        },
+    }
+
+
+def print_report(report):
+    print(f"sessions: {report['sessions']}, failed: {report['failed_sessions']}")
+    for error in report["errors"]:
+        print(f"  error: {error}")
+    for step, values in report["latency_ms"].items():
+        print(f"{step:10} p50 {values['p50']:8.1f} ms   p99 {values['p99']:8.1f} ms   n={values['count']}")
+    print(f"bytes per session: mean {report['bytes_per_session']['mean']}, max {report['bytes_per_session']['max']}")
+    if report["rss_after_wave_mib"]:
+        print(f"RSS after each wave (MiB): {report['rss_after_wave_mib']}")
+        print("RSS over time (s, MiB): " + ", ".join(f"{t}:{m}" for t, m in report["rss_mib"]))
+    if report["leak_suspected"]:
+        print("LEAK SUSPECTED: RSS kept growing between waves")
+    conversations = report["conversations"]
+    if conversations["granted"] or conversations["queued"]:
+        print(f"conversations: granted {conversations['granted']}, queued {conversations['queued']}")
+    if conversations["over_capacity"]:
+        print("OVER CAPACITY: a wave was granted more conversations than the cap")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=50, help="concurrent sessions per wave")
+    parser.add_argument("--waves", type=int, default=3, help="waves of sessions, for leak detection")
+    parser.add_argument("--ramp", type=float, default=None,
+                        help="seconds to open a wave's sessions over (default: 5 logins/s, "
+                             "under the login rate limit)")
+    parser.add_argument("--reruns", type=int, default=3, help="agent view reruns per session")
+    parser.add_argument("--hold", type=float, default=30.0, help="idle seconds connected after the reruns")
+    parser.add_argument("--settle", type=float, default=5.0, help="seconds to wait after each wave")
+    parser.add_argument("--sample-interval", type=float, default=2.0, help="seconds between RSS samples")
+    parser.add_argument("--leak-mib", type=float, default=5.0,
+                        help="RSS growth per wave, after the first, that counts as a leak")
+    parser.add_argument("--conversations", type=int, default=0,
+                        help="conversation slots to cap the server at; sessions then ask for one")
+    parser.add_argument("--url", help="drive an already running server instead of starting one")
+    parser.add_argument("--pid", type=int, help="server process to sample RSS from with --url")
+    parser.add_argument("--json", type=Path, help="also write the report here")
+    args = parser.parse_args(argv)
+    args.password = os.environ.get("HERD_BENCH_PASSWORD", "fsworldcup2026")
+    if args.ramp is None:
+        args.ramp = args.sessions / 5
+
+    try:
+        import websockets  # noqa: F401
+    except ImportError:
+        parser.error("the load harness needs websockets: pip install -r requirements-bench.txt")
+
+    server = None
+    if args.url:
+        url, pid = args.url, args.pid
+    else:
+        server = Server(_free_port(), _free_port(), max_sessions=args.sessions * args.waves + 10,
+                        max_conversations=args.conversations)
+        url, pid = server.url, server.pid
+    try:
+        if server:
+            server.wait_ready()
+        clients, samples, wave_rss = asyncio.run(soak(args, url, pid))
+    finally:
+        if server:
+            server.stop()
+
+    report = summarize(clients, samples, wave_rss, args.leak_mib, args.conversations)
+    print_report(report)
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2) + "\n")
+    if report["failed_sessions"] or report["leak_suspected"] or report["conversations"]["over_capacity"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+"""Rerun latency, allocation and payload-size benchmarks built on AppTest.
+
+Each scenario drives app.py through ``streamlit.testing.v1.AppTest`` and
+measures only the last script run:
+
+- ``cold_login``: first run of a new session
+- ``wrong_password``: submitting a bad password
+- ``correct_password``: submitting the right password (includes the rerun)
+- ``authenticated_rerun``: a plain rerun of the agent view
+
+Results are compared with ``benchmarks/baseline.json``; the command exits
+non-zero when a scenario regresses past the tolerances. Run it with::
+
+    python -m benchmarks.rerun                 # compare with the baseline
+    python -m benchmarks.rerun --update        # record a new baseline
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+APP = ROOT / "app.py"
+BASELINE = Path(__file__).resolve().parent / "baseline.json"
+
+# Allowed growth over the baseline before a scenario counts as a regression
+TOLERANCES = {"wall_ms": 0.5, "alloc_kib": 0.25, "payload_bytes": 0.05}
+
+WRONG_PASSWORD = "not-the-password"
+
+
+def _new_session():
+    from streamlit.testing.v1 import AppTest
+
+    return AppTest.from_file(str(APP), default_timeout=60)
+
+
+def _submit(at, password):
+    at.text_input[0].input(password)
+    at.button[0].click()
+
+
+def _setup_cold_login():
+    return _new_session()
+
+
+def _setup_wrong_password():
+    at = _new_session().run()
+    _submit(at, WRONG_PASSWORD)
+    return at
+
+
+def _setup_correct_password():
+    at = _new_session().run()
+    _submit(at, os.environ.get("HERD_BENCH_PASSWORD", "fsworldcup2026"))
+    return at
+
+
+def _setup_authenticated_rerun():
+    at = _setup_correct_password().run()
+    if not at.session_state["authenticated"]:
+        raise RuntimeError("login failed; set HERD_BENCH_PASSWORD")
+    return at
+
+
+SCENARIOS = {
+    "cold_login": _setup_cold_login,
+    "wrong_password": _setup_wrong_password,
+    "correct_password": _setup_correct_password,
+    "authenticated_rerun": _setup_authenticated_rerun,
+}
+
+
+def payload_bytes(at):
+    """Serialized size of every element proto in the rendered tree"""
+    total = 0
+    stack = [at._tree]
+    while stack:
+        node = stack.pop()
+        proto = getattr(node, "proto", None)
+        if proto is not None and hasattr(proto, "ByteSize"):
+            total += proto.ByteSize()
+        stack.extend(getattr(node, "children", {}).values())
+    return total
+
+
+def measure(setup, repeat):
+    """Median wall time over repeat runs, then one traced run for allocations"""
+    timings = []
+    for _ in range(repeat):
+        at = setup()
+        start = time.perf_counter()
+        at.run()
+        timings.append((time.perf_counter() - start) * 1000)
+        if at.exception:
+            raise RuntimeError(at.exception[0].message)
+
+    at = setup()
+    tracemalloc.start()
+    try:
+        at.run()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "wall_ms": round(statistics.median(timings), 2),
+        "alloc_kib": round(peak / 1024, 1),
+        "payload_bytes": payload_bytes(at),
+    }
+
+
+def regressions(results, baseline):
+    """Human-readable lines for every metric past its tolerance"""
+    problems = []
+    for scenario, values in results.items():
+        expected = baseline.get(scenario)
+        if not expected:
+            continue
+        for metric, tolerance in TOLERANCES.items():
+            limit = expected[metric] * (1 + tolerance)
+            if values[metric] > limit:
+                problems.append(
+                    f"{scenario}.{metric}: {values[metric]} > {expected[metric]} (+{tolerance:.0%})"
+                )
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("scenarios", nargs="*", metavar="scenario",
+                        help=f"subset of {', '.join(SCENARIOS)} (default: all)")
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per scenario")
+    parser.add_argument("--update", action="store_true", help="write results as the new baseline")
+    args = parser.parse_args(argv)
+    unknown = set(args.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenario: {', '.join(sorted(unknown))}")
+
+    # Keep the benchmark self-contained: no sidecar port, no warnings about secrets
+    os.environ.setdefault("HERD_SIDECAR_PORT", "0")
+    os.environ.setdefault("HERD_PUBLIC_PORT", "0")
+    os.environ.setdefault("HERD_AUTH_SECRET", "benchmark")
+    os.environ.setdefault("STREAMLIT_LOGGER_LEVEL", "error")
+    os.chdir(ROOT)
+
+    results = {}
+    for name in args.scenarios or SCENARIOS:
+        results[name] = measure(SCENARIOS[name], args.repeat)
+        print(f"{name:22} {results[name]['wall_ms']:9.2f} ms "
+              f"{results[name]['alloc_kib']:9.1f} KiB peak "
+              f"{results[name]['payload_bytes']:8d} bytes")
+
+    if args.update:
+        BASELINE.write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
+        print(f"baseline written to {BASELINE.relative_to(ROOT)}")
+        return
+
+    baseline = json.loads(BASELINE.read_text()) if BASELINE.exists() else {}
+    problems = regressions(results, baseline)
+    for line in problems:
+        print(f"REGRESSION {line}")
+    if problems:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,129 @@
+"""Cold-start benchmark: time from server start to its first rendered session.
+
+Starts the app, either as ``python -m herd.serve`` or as a container of
+``--image``, and times three milestones from the moment it is launched:
+
+- ``ready``: the sidecar's ``/ready`` answers 200 (state built);
+- ``health``: Streamlit's ``/_stcore/health`` answers 200;
+- ``first_render``: a websocket session's first script run has finished.
+
+Each run starts from scratch and the report gives the median and worst
+time per milestone. Run it with::
+
+    pip install -r requirements-bench.txt
+    python -m benchmarks.startup --runs 5
+    docker build -t herd . && python -m benchmarks.startup --image herd
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+from benchmarks.load import Client, Server, _free_port
+
+MILESTONES = ("ready", "health", "first_render")
+
+
+class Container:
+    """The image under test, started with docker run; same interface as Server"""
+
+    def __init__(self, image, port, sidecar_port):
+        self.url = f"http://127.0.0.1:{port}"
+        self.sidecar_port = sidecar_port
+        self.name = f"herd-startup-{os.getpid()}-{port}"
+        command = [
+            "docker", "run", "--rm", "--name", self.name,
+            "-p", f"127.0.0.1:{port}:8501", "-p", f"127.0.0.1:{sidecar_port}:9108",
+            # /ready is on the operator listener, which binds loopback by default
+            "-e", "HERD_SIDECAR_ADDRESS=0.0.0.0",
+            "-e", "HERD_AUTH_SECRET=startup-benchmark", "-e", "HERD_EVENT_LOG=off",
+            image,
+        ]
+        self.started = time.monotonic()
+        self.process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    def stop(self):
+        subprocess.run(["docker", "rm", "-f", self.name], capture_output=True)
+        try:
+            self.process.wait(10)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+
+
+def wait_for(url, server, timeout):
+    """Seconds from server start until url answers 200"""
+    deadline = server.started + timeout
+    while True:
+        if server.process.poll() is not None:
+            raise RuntimeError(f"server exited with {server.process.returncode}")
+        try:
+            with urllib.request.urlopen(url, timeout=2):
+                return time.monotonic() - server.started
+        except OSError:
+            if time.monotonic() > deadline:
+                raise RuntimeError(f"{url} not up after {timeout}s")
+            time.sleep(0.05)
+
+
+def measure(server, timeout):
+    """{milestone: seconds since launch} for one started server"""
+    result = {
+        "ready": wait_for(f"http://127.0.0.1:{server.sidecar_port}/ready", server, timeout),
+        "health": wait_for(f"{server.url}/_stcore/health", server, timeout),
+    }
+    asyncio.run(Client(0, server.url, password=None).first_run())
+    result["first_render"] = time.monotonic() - server.started
+    return result
+
+
+def summarize(runs):
+    return {
+        milestone: {
+            "median_ms": round(statistics.median(run[milestone] for run in runs) * 1000),
+            "max_ms": round(max(run[milestone] for run in runs) * 1000),
+        }
+        for milestone in MILESTONES
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=3, help="cold starts to time")
+    parser.add_argument("--image", help="docker image to start instead of a local herd.serve")
+    parser.add_argument("--timeout", type=float, default=120.0, help="seconds to wait for each milestone")
+    parser.add_argument("--json", type=Path, help="also write the report here")
+    args = parser.parse_args(argv)
+
+    try:
+        import websockets  # noqa: F401
+    except ImportError:
+        parser.error("the startup benchmark needs websockets: pip install -r requirements-bench.txt")
+
+    runs = []
+    for index in range(args.runs):
+        port, sidecar_port = _free_port(), _free_port()
+        if args.image:
+            server = Container(args.image, port, sidecar_port)
+        else:
+            server = Server(port, sidecar_port, max_sessions=10)
+        try:
+            runs.append(measure(server, args.timeout))
+        finally:
+            server.stop()
+        print(f"run {index + 1}: " + ", ".join(f"{m} {runs[-1][m] * 1000:.0f} ms" for m in MILESTONES))
+
+    report = {"target": args.image or "herd.serve", "runs": len(runs), "milestones": summarize(runs)}
+    for milestone, values in report["milestones"].items():
+        print(f"{milestone:13} median {values['median_ms']:6d} ms   max {values['max_ms']:6d} ms")
+    if args.json:
+        args.json.write_text(json.dumps(report, indent=2) + "\n")
+
+
+if __name__ == "__main__":
+    sys.exit(main())
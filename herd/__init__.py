@@ -0,0 +1 @@
+"""Support modules for the Herd AI Streamlit app."""
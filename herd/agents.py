@@ -0,0 +1,131 @@
+"""Registry of ElevenLabs agents and the lazily mounted widget markup.
+
+The widget iframe starts with a placeholder card. The convai element and
+its script are only added when the user clicks the card or scrolls it into
+view, so visitors who never talk to an agent never download the embed
+bundle or open an agent session.
+"""
+import html
+import json
+from dataclasses import dataclass
+
+WIDGET_SCRIPT = "https://unpkg.com/@elevenlabs/convai-widget-embed"
+WIDGET_HEIGHT = 700
+
+
+@dataclass(frozen=True)
+class Agent:
+    key: str
+    agent_id: str
+    name: str
+    title: str
+    description: str
+
+
+AGENTS = {
+    "cowherd": Agent(
+        key="cowherd",
+        agent_id="agent_6601k4zk42ebeagrspzca4mvebn8",
+        name="Colin Cowherd",
+        title="Colin Cowherd AI Sports Agent",
+        description="Your intelligent companion for FIFA World Cup 2026™ insights, powered by Colin Cowherd's voice",
+    ),
+}
+
+
+def from_config(config):
+    """Agents from the [agents] tables of the shared config, else AGENTS"""
+    tables = config.get("agents")
+    if not tables:
+        return AGENTS
+    return {key: Agent(key=key, **table) for key, table in tables.items()}
+
+
+_WIDGET_TEMPLATE = """
+<style>
+    html, body {{ margin: 0; height: 100%; background: transparent; }}
+    #herd-agent-card {{
+        box-sizing: border-box;
+        display: flex;
+        flex-direction: column;
+        align-items: center;
+        justify-content: center;
+        gap: 1rem;
+        height: 100%;
+        cursor: pointer;
+        color: #FFFFFF;
+        font-family: 'Industry', -apple-system, BlinkMacSystemFont, 'Segoe UI', sans-serif;
+        letter-spacing: 0.05em;
+        text-align: center;
+    }}
+    #herd-agent-card button {{
+        background: linear-gradient(135deg, #0084FF 0%, #0066CC 100%);
+        color: white;
+        border: none;
+        padding: 1rem 3rem;
+        border-radius: 10px;
+        font-size: 1.1rem;
+        font-weight: 600;
+        letter-spacing: 0.12em;
+        text-transform: uppercase;
+        cursor: pointer;
+        box-shadow: 0 6px 20px rgba(0, 0, 0, 0.5);
+    }}
+</style>
+<div id="herd-agent-card">
+    <button type="button">▸ Talk to {name}</button>
+</div>
+<script>
+    (function () {{
+        const card = document.getElementById('herd-agent-card');
+        let mounted = false;
+        function mount() {{
+            if (mounted) return;
+            mounted = true;
+            card.remove();
+            const widget = document.createElement('elevenlabs-convai');
+            widget.setAttribute('agent-id', {agent_id});
+            document.body.appendChild(widget);
+            const script = document.createElement('script');
+            script.src = {script_src};
+            script.async = true;
+            if ({integrity}) {{
+                script.integrity = {integrity};
+                script.crossOrigin = 'anonymous';
+            }}
+            document.body.appendChild(script);
+        }}
+        card.addEventListener('click', mount);
+        if ({autostart}) {{
+            mount();
+            return;
+        }}
+        // Mount when scrolled into view; the observer's first report is the
+        // initial layout, which does not count as scrolling.
+        if ('IntersectionObserver' in window) {{
+            let initial = true;
+            const observer = new IntersectionObserver((entries) => {{
+                const visible = entries.some((entry) => entry.isIntersecting);
+                if (visible && !initial) {{
+                    observer.disconnect();
+                    mount();
+                }}
+                initial = false;
+            }}, {{ threshold: 0.5 }});
+            observer.observe(card);
+        }}
+    }})();
+</script>
+"""
+
+
+def widget_html(agent, script_src=WIDGET_SCRIPT, integrity=None, autostart=False):
+    """Placeholder card that mounts the convai widget for agent on demand,
+    or right away with autostart"""
+    return _WIDGET_TEMPLATE.format(
+        name=html.escape(agent.name),
+        agent_id=json.dumps(agent.agent_id),
+        script_src=json.dumps(script_src),
+        integrity=json.dumps(integrity),
+        autostart=json.dumps(autostart),
+    )
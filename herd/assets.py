@@ -0,0 +1,189 @@
+"""Publish files under assets/ under content-hashed names.
+
+Every asset is copied to ``static/assets`` under a content-hashed filename,
+so a URL never changes meaning and browsers fetch each file once per
+content change instead of receiving it base64-encoded inside the
+stylesheet on every rerun.
+
+Streamlit serves ``<app dir>/static`` at ``app/static/`` once
+``server.enableStaticServing`` is on, but only with ``ETag`` and
+``Last-Modified``, so browsers revalidate the files. The sidecar's public
+listener also serves them at ``/assets/`` with ``Cache-Control: immutable``;
+set ``HERD_ASSET_URL`` to the address that reaches that route to have the
+pages reference it instead.
+
+``publish()`` returns an immutable ``AssetStore`` describing what it
+published. Reruns only look URLs up in it; ``stale()`` compares the
+recorded mtimes with the files on disk so a changed asset leads to a new
+store being built and swapped in.
+"""
+import hashlib
+import json
+import mimetypes
+import os
+from collections.abc import Mapping
+from dataclasses import dataclass
+from pathlib import Path
+from types import MappingProxyType
+
+from herd import sidecar
+
+ROOT = Path(__file__).resolve().parent.parent
+ASSETS_DIR = ROOT / "assets"
+STATIC_DIR = ROOT / "static"
+PUBLISHED_DIR = STATIC_DIR / "assets"
+URL_PREFIX = "app/static/assets"
+SIDECAR_PATH = "/assets/"
+MANIFEST_NAME = "manifest.json"
+
+# Types mimetypes does not know on every platform
+_MIME_TYPES = {
+    ".otf": "font/otf",
+    ".woff2": "font/woff2",
+    ".webp": "image/webp",
+}
+
+
+@dataclass(frozen=True)
+class Asset:
+    path: str  # relative to assets/
+    url: str
+    digest: str
+    mime: str
+    size: int
+    mtime: float
+
+
+class AssetStore(Mapping):
+    """Published assets keyed by path relative to assets/, mapping to their URLs.
+
+    Behaves as a read-only {relative path: url} dict, so it can be passed
+    wherever a URL map is expected; asset() returns the full record.
+    """
+
+    def __init__(self, assets, src_dir, exclude, stamps):
+        self._assets = MappingProxyType(dict(assets))
+        self._src_dir = src_dir
+        self._exclude = frozenset(exclude)
+        self._stamps = stamps
+
+    def __getitem__(self, relative):
+        return self._assets[relative].url
+
+    def __iter__(self):
+        return iter(self._assets)
+
+    def __len__(self):
+        return len(self._assets)
+
+    def asset(self, relative):
+        return self._assets.get(relative)
+
+    def missing(self, names):
+        """The names among names that were not published, sorted"""
+        return sorted(set(names) - set(self._assets))
+
+    def stale(self):
+        """True when a source file was added, removed or modified since publishing"""
+        return _stamps(self._src_dir, self._exclude) != self._stamps
+
+
+def mime_type(path):
+    suffix = Path(path).suffix.lower()
+    return _MIME_TYPES.get(suffix) or mimetypes.guess_type(path)[0] or "application/octet-stream"
+
+
+def _stamps(src_dir, exclude):
+    """{relative path: (mtime_ns, size)} of every file under src_dir not excluded"""
+    stamps = {}
+    for src in sorted(p for p in src_dir.rglob("*") if p.is_file()):
+        relative = src.relative_to(src_dir).as_posix()
+        if relative not in exclude:
+            stat = src.stat()
+            stamps[relative] = (stat.st_mtime_ns, stat.st_size)
+    return stamps
+
+
+def url_prefix(base_url=None):
+    """Where published assets are referenced: the sidecar route behind
+    HERD_ASSET_URL if set, else Streamlit's static route"""
+    base_url = base_url if base_url is not None else os.environ.get("HERD_ASSET_URL")
+    if base_url:
+        return base_url.rstrip("/") + SIDECAR_PATH.rstrip("/")
+    return URL_PREFIX
+
+
+def content_hash(data):
+    """Short content hash used in published filenames"""
+    return hashlib.sha256(data).hexdigest()[:12]
+
+
+def hashed_name(relative_path, digest):
+    """Insert the digest before the suffix: fonts/A.otf -> fonts/A.<digest>.otf"""
+    path = Path(relative_path)
+    return (path.parent / f"{path.stem}.{digest}{path.suffix}").as_posix()
+
+
+def publish(src_dir=ASSETS_DIR, dest_dir=PUBLISHED_DIR, exclude=(), base_url=None):
+    """Copy every asset to its hashed name and return an AssetStore of them
+
+    exclude lists relative paths to leave out, e.g. the unused assets
+    reported by herd.images. base_url overrides HERD_ASSET_URL.
+    """
+    prefix = url_prefix(base_url)
+    dest_dir.mkdir(parents=True, exist_ok=True)
+    exclude = set(exclude)
+    stamps = _stamps(src_dir, exclude)  # before reading, so edits made meanwhile count as stale
+    published = {}
+    for relative, (mtime_ns, _) in stamps.items():
+        data = (src_dir / relative).read_bytes()
+        digest = content_hash(data)
+        name = hashed_name(relative, digest)
+        target = dest_dir / name
+        if not target.exists():
+            target.parent.mkdir(parents=True, exist_ok=True)
+            tmp = target.with_name(target.name + ".tmp")
+            tmp.write_bytes(data)
+            tmp.replace(target)
+        published[relative] = Asset(
+            path=relative,
+            url=f"{prefix}/{name}",
+            digest=digest,
+            mime=mime_type(relative),
+            size=len(data),
+            mtime=mtime_ns / 1e9,
+        )
+
+    store = AssetStore(published, src_dir, exclude, stamps)
+    _remove_stale(dest_dir, store)
+    (dest_dir / MANIFEST_NAME).write_text(json.dumps(dict(store), indent=2, sort_keys=True))
+    return store
+
+
+def _remove_stale(dest_dir, store):
+    """Drop hashed copies left behind by previous versions of an asset"""
+    current = {hashed_name(relative, store.asset(relative).digest) for relative in store}
+    for path in dest_dir.rglob("*"):
+        if not path.is_file() or path.name == MANIFEST_NAME:
+            continue
+        if path.relative_to(dest_dir).as_posix() not in current:
+            path.unlink()
+    for path in sorted(dest_dir.rglob("*"), reverse=True):
+        if path.is_dir() and not any(path.iterdir()):
+            path.rmdir()
+
+
+@sidecar.route(SIDECAR_PATH, prefix=True, public=True)
+def _asset_route(request):
+    name = request.path.split("?", 1)[0][len(SIDECAR_PATH):]
+    path = (PUBLISHED_DIR / name).resolve()
+    published = PUBLISHED_DIR.resolve()
+    if published not in path.parents or path.name == MANIFEST_NAME or not path.is_file():
+        return 404, {"Content-Type": "text/plain"}, b"not found\n"
+    headers = {
+        "Content-Type": mime_type(path.name),
+        "Cache-Control": "public, max-age=31536000, immutable",
+        # Fonts are fetched with CORS when the pages are on another origin
+        "Access-Control-Allow-Origin": "*",
+    }
+    return 200, headers, path.read_bytes()
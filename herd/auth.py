@@ -0,0 +1,146 @@
+"""Signed, expiring auth tokens stored in the herd_ai_auth cookie.
+
+A token is ``v1.<expiry>.<signature>`` where the signature is an HMAC-SHA256
+of ``v1.<expiry>`` under a server secret. The server checks the cookie from
+the websocket handshake on the first script run, so a returning user gets
+the agent view without a client-side redirect.
+"""
+import base64
+import hashlib
+import hmac
+import logging
+import os
+import secrets
+import time
+
+import streamlit as st
+
+COOKIE_NAME = "herd_ai_auth"
+TOKEN_VERSION = "v1"
+TOKEN_TTL = 30 * 24 * 60 * 60
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def _signature(secret, payload):
+    digest = hmac.new(secret.encode(), payload.encode(), hashlib.sha256).digest()
+    return base64.urlsafe_b64encode(digest).rstrip(b"=").decode()
+
+
+def sign_token(secret, ttl=TOKEN_TTL, now=None):
+    """Token valid for ttl seconds from now"""
+    expiry = int((now if now is not None else time.time()) + ttl)
+    payload = f"{TOKEN_VERSION}.{expiry}"
+    return f"{payload}.{_signature(secret, payload)}"
+
+
+def verify_token(secret, token, now=None):
+    """True if token was signed with secret and has not expired"""
+    if not token:
+        return False
+    try:
+        version, expiry, signature = token.split(".")
+        expiry = int(expiry)
+    except ValueError:
+        return False
+    if version != TOKEN_VERSION:
+        return False
+    # Bytes, since compare_digest rejects str with non-ASCII characters
+    expected = _signature(secret, f"{version}.{expiry}").encode()
+    if not hmac.compare_digest(signature.encode("utf-8", "replace"), expected):
+        return False
+    return expiry > (now if now is not None else time.time())
+
+
+# Values from the example secrets file and docs, which anyone could sign with
+PLACEHOLDER_SECRETS = frozenset({"change-me", "<random string>"})
+
+
+def load_secret(required=False):
+    """Signing key from st.secrets["auth_secret"] or HERD_AUTH_SECRET.
+
+    Without either, a random key is generated, so tokens only survive until
+    the process restarts; with required=True that is an error instead.
+    """
+    try:
+        secret = st.secrets.get("auth_secret")
+    except Exception:  # no secrets.toml at all
+        secret = None
+    secret = secret or os.environ.get("HERD_AUTH_SECRET")
+    if secret in PLACEHOLDER_SECRETS:
+        raise RuntimeError("auth_secret is still the example placeholder; generate a random key")
+    if not secret and required:
+        raise RuntimeError("auth_secret or HERD_AUTH_SECRET must be set")
+    if not secret:
+        _LOGGER.warning("No auth_secret configured; login cookies will not survive a restart")
+        secret = secrets.token_urlsafe(32)
+    return secret
+
+
+def request_token():
+    """herd_ai_auth cookie sent with this session's websocket handshake"""
+    return st.context.cookies.get(COOKIE_NAME)
+
+
+# Password hashes are "pbkdf2_sha256$<iterations>$<salt>$<hash>", base64url encoded
+PASSWORD_SCHEME = "pbkdf2_sha256"
+PASSWORD_ITERATIONS = 240_000
+DEFAULT_PASSWORD = "fsworldcup2026"
+
+
+def cookie_ttl(config=None):
+    """Login cookie lifetime in seconds from [auth] cookie_ttl_days, default TOKEN_TTL"""
+    days = (config or {}).get("auth", {}).get("cookie_ttl_days")
+    return int(days * 24 * 60 * 60) if days is not None else TOKEN_TTL
+
+
+def _b64(data):
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode()
+
+
+def _unb64(text):
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def hash_password(password, iterations=PASSWORD_ITERATIONS, salt=None):
+    """Encode password for the password_hash secret"""
+    salt = salt or secrets.token_bytes(16)
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode(), salt, iterations)
+    return f"{PASSWORD_SCHEME}${iterations}${_b64(salt)}${_b64(digest)}"
+
+
+def verify_password(password, encoded):
+    """Constant-time check of password against a hash_password() string"""
+    try:
+        scheme, iterations, salt, expected = encoded.split("$")
+        iterations = int(iterations)
+        salt, expected = _unb64(salt), _unb64(expected)
+    except (ValueError, AttributeError):
+        return False
+    if scheme != PASSWORD_SCHEME:
+        return False
+    digest = hashlib.pbkdf2_hmac("sha256", password.encode(), salt, iterations)
+    return hmac.compare_digest(digest, expected)
+
+
+def load_password_hash(required=False, config=None):
+    """password_hash from st.secrets, HERD_PASSWORD_HASH or [auth] in the
+    shared config, else the default password"""
+    try:
+        encoded = st.secrets.get("password_hash")
+    except Exception:  # no secrets.toml at all
+        encoded = None
+    encoded = encoded or os.environ.get("HERD_PASSWORD_HASH")
+    encoded = encoded or (config or {}).get("auth", {}).get("password_hash")
+    if not encoded and required:
+        raise RuntimeError("password_hash, HERD_PASSWORD_HASH or [auth] password_hash must be set")
+    if not encoded:
+        _LOGGER.warning("No password_hash configured; using the default password")
+        encoded = hash_password(DEFAULT_PASSWORD)
+    return encoded
+
+
+if __name__ == "__main__":
+    import getpass
+
+    print(hash_password(getpass.getpass("Password: ")))
@@ -0,0 +1,64 @@
+"""Shared configuration file for agents, branding, copy and auth settings.
+
+Every replica reads the same TOML file, named by ``HERD_CONFIG`` (default
+``herd.toml`` next to app.py), so any replica renders the same agents and
+styling. A missing file means built-in defaults. See herd.example.toml.
+
+The file is parsed once into a read-only mapping (``freeze``) that is part
+of the warmed state. Warm-up parses it again only when its ``stamp()``
+changes or a reload is signalled, and swaps in the new state whole.
+"""
+import os
+from pathlib import Path
+from types import MappingProxyType
+
+try:
+    import tomllib
+
+    def _parse(text):
+        return tomllib.loads(text)
+except ImportError:  # Python < 3.11; Streamlit depends on toml there
+    import toml
+
+    def _parse(text):
+        return toml.loads(text)
+
+ROOT = Path(__file__).resolve().parent.parent
+DEFAULT_PATH = ROOT / "herd.toml"
+
+
+def config_path():
+    return Path(os.environ.get("HERD_CONFIG", DEFAULT_PATH))
+
+
+def load(path=None):
+    """Parsed config as a dict, or {} when the file does not exist"""
+    path = Path(path) if path else config_path()
+    try:
+        return _parse(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        return {}
+
+
+def freeze(value):
+    """value with tables as read-only mappings and arrays as tuples, all the way down"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def stamp(path=None):
+    """(mtime_ns, size) of the config file, or None when it does not exist"""
+    path = Path(path) if path else config_path()
+    try:
+        stat = path.stat()
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def stateless():
+    """True when replicas must not depend on per-process state (HERD_STATELESS=1)"""
+    return os.environ.get("HERD_STATELESS", "").lower() in ("1", "true", "yes")
@@ -0,0 +1,135 @@
+"""Usage events written to a JSON Lines file off the script thread.
+
+``EventLog.emit()`` only puts the event on a bounded queue and never
+blocks: when the queue is full the event is dropped and counted. A daemon
+thread drains the queue in batches, appends them to the log file and
+rotates it by size (``events.jsonl`` -> ``events.jsonl.1`` ...).
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import socket
+import threading
+import time
+from pathlib import Path
+
+from herd import metrics
+from herd.assets import ROOT
+
+DEFAULT_PATH = ROOT / "logs" / "events.jsonl"
+DEFAULT_QUEUE_SIZE = 10_000
+BATCH_SIZE = 500
+FLUSH_INTERVAL = 1.0
+MAX_BYTES = 10 * 1024 * 1024
+BACKUPS = 5
+
+_LOGGER = logging.getLogger(__name__)
+_HOST = socket.gethostname()
+
+
+class EventLog:
+    """Bounded queue plus a background writer; see the module docstring"""
+
+    def __init__(self, path=DEFAULT_PATH, queue_size=DEFAULT_QUEUE_SIZE, batch_size=BATCH_SIZE,
+                 flush_interval=FLUSH_INTERVAL, max_bytes=MAX_BYTES, backups=BACKUPS,
+                 clock=time.time):
+        self.path = Path(path)
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.clock = clock
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._stopping = threading.Event()
+        self._thread = None
+        self._start_lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls):
+        """Log at HERD_EVENT_LOG (default logs/events.jsonl); None if it is "off" """
+        path = os.environ.get("HERD_EVENT_LOG", str(DEFAULT_PATH))
+        if path.lower() in ("", "0", "off"):
+            return None
+        return cls(
+            path=path,
+            queue_size=int(os.environ.get("HERD_EVENT_QUEUE_SIZE", DEFAULT_QUEUE_SIZE)),
+        )
+
+    def emit(self, kind, **fields):
+        """Queue one event; returns False if it was dropped because the queue is full"""
+        self._ensure_started()
+        event = {"ts": round(self.clock(), 3), "event": kind, "host": _HOST, **fields}
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            metrics.EVENTS_DROPPED.inc(reason="queue_full")
+            return False
+        metrics.EVENT_QUEUE.set(self._queue.qsize())
+        return True
+
+    def close(self, timeout=5.0):
+        """Stop the writer after it has written what is queued"""
+        self._stopping.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _ensure_started(self):
+        if self._thread is not None:
+            return
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="herd-events", daemon=True)
+                self._thread.start()
+                atexit.register(self.close)
+
+    def _run(self):
+        while not (self._stopping.is_set() and self._queue.empty()):
+            batch = self._next_batch()
+            if batch:
+                self._write(batch)
+            metrics.EVENT_QUEUE.set(self._queue.qsize())
+
+    def _next_batch(self):
+        """Wait up to flush_interval for one event, then take what else is queued"""
+        try:
+            batch = [self._queue.get(timeout=self.flush_interval)]
+        except queue.Empty:
+            return []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, batch):
+        lines = "".join(json.dumps(event, separators=(",", ":"), default=str) + "\n"
+                        for event in batch)
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._rotate_if_needed()
+            with self.path.open("a", encoding="utf-8") as log:
+                log.write(lines)
+        except OSError:
+            _LOGGER.exception("Writing %d events to %s failed", len(batch), self.path)
+            metrics.EVENTS_DROPPED.inc(len(batch), reason="write_error")
+            return
+        metrics.EVENTS_WRITTEN.inc(len(batch))
+
+    def _rotate_if_needed(self):
+        try:
+            size = self.path.stat().st_size
+        except FileNotFoundError:
+            return
+        if size < self.max_bytes:
+            return
+        for index in range(self.backups - 1, 0, -1):
+            older = self.path.with_name(f"{self.path.name}.{index}")
+            if older.exists():
+                older.replace(self.path.with_name(f"{self.path.name}.{index + 1}"))
+        if self.backups:
+            self.path.replace(self.path.with_name(f"{self.path.name}.1"))
+        else:
+            self.path.unlink()
@@ -0,0 +1,158 @@
+"""Subset the Industry faces to the glyphs the app uses and convert to WOFF2.
+
+Run ``python -m herd.fonts`` after changing UI copy. The subsets land in
+``assets/fonts/industry-woff2`` together with ``fonts.json``, which the
+theme reads to emit ``unicode-range`` @font-face rules. The full OTF is
+only declared for the characters it has beyond the subset, so copy the
+font lacks falls back to a system font instead of fetching the OTF too.
+
+Requires fontTools and brotli (``pip install -r requirements-build.txt``).
+"""
+import argparse
+import ast
+import io
+import json
+import sys
+import tokenize
+
+from herd import config
+from herd.assets import ASSETS_DIR, ROOT
+
+SOURCE_DIR = ASSETS_DIR / "fonts/industry-font"
+OUTPUT_DIR = ASSETS_DIR / "fonts/industry-woff2"
+MANIFEST = OUTPUT_DIR / "fonts.json"
+FACES = ("Light", "Book", "Medium", "Demi")
+
+# Files whose string literals make up the visible copy
+TEXT_SOURCES = (ROOT / "app.py", ROOT / "herd" / "profiles.py")
+# Shared configs whose strings (titles, footers, [copy], agent text) are shown
+CONFIG_SOURCES = (ROOT / "herd.example.toml",)
+
+# Printable ASCII is always kept so typed input and new copy render in Industry
+BASE_CODEPOINTS = frozenset(range(0x20, 0x7F))
+
+# Upper bound on the four subsets together
+BUDGET_BYTES = 48 * 1024
+
+
+def _config_strings(value):
+    if isinstance(value, str):
+        yield value
+    elif isinstance(value, dict):
+        for item in value.values():
+            yield from _config_strings(item)
+    elif isinstance(value, list):
+        for item in value:
+            yield from _config_strings(item)
+
+
+def used_codepoints(sources=TEXT_SOURCES, configs=None):
+    """Codepoints from every string literal in sources and every string in
+    configs (default: CONFIG_SOURCES and HERD_CONFIG), plus printable ASCII"""
+    configs = (*CONFIG_SOURCES, config.config_path()) if configs is None else configs
+    text = []
+    for path in configs:
+        text.extend(_config_strings(config.load(path)))
+    for path in sources:
+        if not path.exists():
+            continue
+        tokens = tokenize.generate_tokens(io.StringIO(path.read_text(encoding="utf-8")).readline)
+        for token in tokens:
+            if token.type != tokenize.STRING:
+                continue
+            try:
+                value = ast.literal_eval(token.string)
+            except (ValueError, SyntaxError):
+                # f-strings: the literal parts are still worth keeping
+                value = token.string
+            if isinstance(value, str):
+                text.append(value)
+    joined = "".join(text)
+    # text-transform: uppercase is applied to buttons and the login title
+    joined += joined.upper() + joined.lower()
+    return BASE_CODEPOINTS | {ord(ch) for ch in joined if ord(ch) >= 0x20}
+
+
+def unicode_range(codepoints):
+    """Format codepoints as a CSS unicode-range value"""
+    ranges = []
+    for cp in sorted(codepoints):
+        if ranges and cp == ranges[-1][1] + 1:
+            ranges[-1][1] = cp
+        else:
+            ranges.append([cp, cp])
+    return ",".join(f"U+{lo:X}" if lo == hi else f"U+{lo:X}-{hi:X}" for lo, hi in ranges)
+
+
+def subset_face(src, dest, codepoints):
+    """Write a WOFF2 subset of src; return (codepoints it covers, codepoints of src)"""
+    from fontTools import subset
+    from fontTools.ttLib import TTFont
+
+    options = subset.Options()
+    options.flavor = "woff2"
+    options.layout_features = ["*"]
+    font = TTFont(src)
+    available = set(font.getBestCmap())
+    subsetter = subset.Subsetter(options=options)
+    subsetter.populate(unicodes=codepoints)
+    subsetter.subset(font)
+    dest.parent.mkdir(parents=True, exist_ok=True)
+    font.flavor = "woff2"
+    font.save(dest)
+    return set(font.getBestCmap()), available
+
+
+def build(faces=FACES):
+    """Subset every face, write fonts.json and return (manifest, total bytes)"""
+    codepoints = used_codepoints()
+    manifest = {}
+    total = 0
+    for face in faces:
+        src = SOURCE_DIR / f"IndustryTest-{face}.otf"
+        dest = OUTPUT_DIR / f"IndustryTest-{face}.woff2"
+        covered, available = subset_face(src, dest, codepoints)
+        size = dest.stat().st_size
+        total += size
+        manifest[src.relative_to(ASSETS_DIR).as_posix()] = {
+            "woff2": dest.relative_to(ASSETS_DIR).as_posix(),
+            "unicode_range": unicode_range(covered),
+            # What only the OTF has; empty when the subset covers the whole font
+            "fallback_range": unicode_range(available - covered),
+            "bytes": size,
+            "source_bytes": src.stat().st_size,
+        }
+    MANIFEST.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+    return manifest, total
+
+
+def load_manifest():
+    """Return fonts.json, or {} when the subsets have not been built"""
+    try:
+        return json.loads(MANIFEST.read_text())
+    except FileNotFoundError:
+        return {}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--budget", type=int, default=BUDGET_BYTES,
+                        help="maximum total WOFF2 bytes (default: %(default)s)")
+    args = parser.parse_args(argv)
+
+    try:
+        import brotli  # noqa: F401  (fontTools needs it for WOFF2)
+        import fontTools  # noqa: F401
+    except ImportError:
+        sys.exit("fontTools and brotli are required: pip install -r requirements-build.txt")
+
+    manifest, total = build()
+    for name, entry in manifest.items():
+        print(f"{entry['woff2']}: {entry['source_bytes']} -> {entry['bytes']} bytes")
+    print(f"total: {total} bytes (budget {args.budget})")
+    if total > args.budget:
+        sys.exit(f"font budget exceeded by {total - args.budget} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+"""Build width-bucketed WebP variants of the images the app displays.
+
+Run ``python -m herd.images`` after changing anything under ``assets/``.
+Variants land in ``assets/images`` with an ``images.json`` manifest that
+the theme turns into ``image-set()`` backgrounds and the logo into a
+``srcset``. The manifest also lists assets no source file references;
+``assets.publish`` leaves those out of ``static/``.
+
+Only WebP is produced: Streamlit's static file handler serves types
+outside its safe list (AVIF included) as ``text/plain`` with ``nosniff``,
+which browsers refuse to decode as images.
+
+Requires Pillow (``pip install -r requirements-build.txt``).
+"""
+import argparse
+import json
+import sys
+
+from herd import config
+from herd.assets import ASSETS_DIR, ROOT
+from herd.fonts import OUTPUT_DIR as FONTS_OUTPUT_DIR
+
+OUTPUT_DIR = ASSETS_DIR / "images"
+MANIFEST = OUTPUT_DIR / "images.json"
+
+# Widths to produce, in CSS pixels times the densities used
+BACKGROUND_WIDTHS = (640, 1280, 1920, 2560)
+LOGO_WIDTHS = (100, 200)
+
+# Source image -> widths for the built-in profile; configured_sources() adds every
+# background and logo the shared config's profiles name
+SOURCES = {
+    "TheHerd_Final_wide.png": BACKGROUND_WIDTHS,
+    "fox-sports.jpg": LOGO_WIDTHS,
+}
+
+WEBP_QUALITY = 80
+
+# Python files scanned for asset references, plus the shared config,
+# whose branding profiles name backgrounds, logos and fonts
+REFERENCE_SOURCES = (ROOT / "app.py", ROOT / "herd")
+
+
+def resize_variants(name, widths):
+    """Write WebP variants of assets/<name> and return their manifest entries"""
+    from PIL import Image
+
+    src = ASSETS_DIR / name
+    stem = src.stem
+    variants = []
+    with Image.open(src) as image:
+        image = image.convert("RGBA" if "A" in image.getbands() else "RGB")
+        for width in widths:
+            width = min(width, image.width)
+            if any(v["width"] == width for v in variants):
+                continue
+            height = round(image.height * width / image.width)
+            dest = OUTPUT_DIR / f"{stem}-{width}w.webp"
+            dest.parent.mkdir(parents=True, exist_ok=True)
+            image.resize((width, height), Image.LANCZOS).save(
+                dest, "WEBP", quality=WEBP_QUALITY, method=6
+            )
+            variants.append({
+                "path": dest.relative_to(ASSETS_DIR).as_posix(),
+                "width": width,
+                "type": "image/webp",
+                "bytes": dest.stat().st_size,
+            })
+    return variants
+
+
+def find_unused(sources=None):
+    """Assets whose filename appears in none of the Python sources or the config"""
+    if sources is None:
+        sources = (*REFERENCE_SOURCES, config.config_path())
+    text = []
+    for path in sources:
+        files = path.rglob("*.py") if path.is_dir() else [path] if path.exists() else []
+        text.extend(f.read_text(encoding="utf-8") for f in files)
+    text = "\n".join(text)
+    generated = (OUTPUT_DIR, FONTS_OUTPUT_DIR)
+    unused = []
+    for path in sorted(p for p in ASSETS_DIR.rglob("*") if p.is_file()):
+        if any(g in path.parents for g in generated):
+            continue
+        if path.name not in text:
+            unused.append(path.relative_to(ASSETS_DIR).as_posix())
+    return unused
+
+
+def configured_sources(shared_config=None):
+    """SOURCES plus the background and logo of every profile in the shared config"""
+    shared_config = config.load() if shared_config is None else shared_config
+    found = dict(SOURCES)
+    for table in shared_config.get("profiles", {}).values():
+        if "background" in table:
+            found[table["background"]] = BACKGROUND_WIDTHS
+        if "logo" in table:
+            found[table["logo"]] = LOGO_WIDTHS
+    return found
+
+
+def build(sources=None):
+    """Produce every variant, write images.json and return the manifest"""
+    sources = configured_sources() if sources is None else sources
+    built = {}
+    for name, widths in sources.items():
+        try:
+            built[name] = resize_variants(name, widths)
+        except OSError as exc:
+            # e.g. a Git LFS pointer checked out without `git lfs pull`
+            print(f"skipping {name}: {exc}", file=sys.stderr)
+    manifest = {"images": built, "unused": find_unused()}
+    MANIFEST.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+    return manifest
+
+
+def load_manifest():
+    """Return images.json, or {} when the variants have not been built"""
+    try:
+        return json.loads(MANIFEST.read_text())
+    except FileNotFoundError:
+        return {}
+
+
+def variants(manifest, name):
+    """WebP variants of name sorted by width, or [] if none were built"""
+    return sorted(manifest.get("images", {}).get(name, ()), key=lambda v: v["width"])
+
+
+def pick(variant_list, width):
+    """Smallest variant at least width wide, else the largest"""
+    for variant in variant_list:
+        if variant["width"] >= width:
+            return variant
+    return variant_list[-1]
+
+
+def srcset(variant_list, urls, display_width, densities=(1, 2)):
+    """srcset value covering each density for an image shown display_width wide"""
+    candidates, seen = [], set()
+    for density in densities:
+        url = urls.get(pick(variant_list, display_width * density)["path"])
+        if url and url not in seen:
+            seen.add(url)
+            candidates.append(f"{url} {density}x")
+    return ", ".join(candidates)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.parse_args(argv)
+
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        sys.exit("Pillow is required: pip install -r requirements-build.txt")
+
+    manifest = build()
+    for name, entries in manifest["images"].items():
+        original = (ASSETS_DIR / name).stat().st_size
+        sizes = ", ".join(f"{v['width']}w={v['bytes']}" for v in entries)
+        print(f"{name} ({original} bytes): {sizes}")
+    for name in manifest["unused"]:
+        print(f"unused, excluded from static/: {name} ({(ASSETS_DIR / name).stat().st_size} bytes)")
+
+
+if __name__ == "__main__":
+    main()
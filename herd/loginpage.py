@@ -0,0 +1,233 @@
+"""The login view as a standalone page served without a Streamlit session.
+
+Anonymous visitors get a pre-rendered HTML page from the sidecar's public
+listener at ``/login``, branded for the profile its Host header selects.
+It uses the compiled login stylesheet, the same title and footer markup as
+the app, the same lite-mode probe and the same warm-up hints. The form posts back
+to the sidecar, which checks the password with the shared rate limiter,
+sets the signed auth cookie and redirects to the app. The first websocket
+session is opened by an already authenticated browser.
+
+    python -m herd.loginpage --output dist/login.html --action https://herd.example.com/login
+
+exports the page for hosting elsewhere.
+"""
+import argparse
+import html
+import math
+import os
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+from herd import auth, metrics, profiles, ratelimit, sidecar, theme, warmup
+
+LOGIN_PATH = "/login"
+MAX_FORM_BYTES = 4096
+
+_TITLE = """
+<h2 style="color: white; font-size: 3.5rem; font-weight: 600;
+           letter-spacing: 0.12em; text-shadow: 0 4px 8px rgba(0, 0, 0, 1);
+           font-family: 'Industry', -apple-system, BlinkMacSystemFont, 'Segoe UI', sans-serif;
+           text-transform: uppercase; text-align: center; margin-bottom: 2rem;">
+    {title}
+</h2>
+"""
+
+_FOOTER = """
+<div class="login-footer">
+    {first}<br>
+    <span>{second}</span>
+</div>
+"""
+
+
+def login_title(profile):
+    """Title markup of the login view, shared by the app and the static page"""
+    return _TITLE.format(title=html.escape(profile.title.upper()))
+
+
+def login_footer(profile):
+    first, second = profile.login_footer
+    return _FOOTER.format(first=html.escape(first), second=html.escape(second))
+
+
+# Streamlit's layout, which the login stylesheet assumes, reduced to the
+# centered column the form sits in
+_PAGE_CSS = """
+<style>
+.stApp{min-height:100vh}
+.login-page{max-width:736px;margin:0 auto;padding:6rem 1rem 6rem}
+.stForm{display:block}
+.stTextInput input,.stButton>button{box-sizing:border-box;width:100%}
+</style>
+"""
+
+_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>{page_title}</title>
+<base href="{base}">
+<link rel="icon" href="data:image/svg+xml,<svg xmlns=%22http://www.w3.org/2000/svg%22 viewBox=%220 0 100 100%22><text y=%22.9em%22 font-size=%2290%22>{page_icon}</text></svg>">
+{stylesheet}
+{page_css}
+</head>
+<body>
+<div class="stApp">
+<div class="main login-page">
+<div style="margin-top: 2rem;"></div>
+{title}
+<form class="stForm" method="post" action="{action}">
+<div class="stTextInput"><div><div>
+<input type="password" name="password" placeholder="{placeholder}" aria-label="Password"
+       autocomplete="current-password" required autofocus>
+</div></div></div>
+<div style="margin-top: 1.5rem;"></div>
+<div class="stButton"><button type="submit">{login_button}</button></div>
+</form>
+<div class="stAlert" id="login-error" role="alert" hidden></div>
+</div>
+{footer}
+</div>
+<script>
+    (function () {{
+        const params = new URLSearchParams(window.location.search);
+        const messages = {{password: {password_error}, throttled: {throttle_error}}};
+        const message = messages[params.get('error')];
+        if (!message) return;
+        const alert = document.getElementById('login-error');
+        alert.textContent = message.replace('{{seconds}}', params.get('wait') || '');
+        alert.hidden = false;
+    }})();
+</script>
+{lite_probe}
+{warmup}
+</body>
+</html>
+"""
+
+
+def app_url():
+    """Where the app is served; HERD_APP_URL, default the site root"""
+    return os.environ.get("HERD_APP_URL", "/")
+
+
+def login_url():
+    """URL of the static login page that anonymous sessions are sent to, if any"""
+    return os.environ.get("HERD_LOGIN_URL") or None
+
+
+def _js_string(text):
+    return '"' + text.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def render(branding, action="", base=None):
+    """The login page of a compiled branding; action="" posts back to the page's own URL"""
+    profile = branding.profile
+    return _TEMPLATE.format(
+        base=html.escape(base or app_url(), quote=True),
+        page_title=html.escape(profile.title),
+        page_icon=html.escape(profile.page_icon),
+        stylesheet=branding.bundles["login"],
+        page_css=_PAGE_CSS.strip(),
+        title=login_title(profile).strip(),
+        action=html.escape(action, quote=True),
+        placeholder=html.escape(profile.copy["password_placeholder"], quote=True),
+        login_button=html.escape(profile.copy["login_button"]),
+        footer=login_footer(profile).strip(),
+        password_error=_js_string(profile.copy["password_error"]),
+        throttle_error=_js_string(profile.copy["throttle_error"]),
+        lite_probe=theme.LITE_PROBE.strip(),
+        warmup=branding.warmup_html.strip(),
+    )
+
+
+_pages = (None, {})
+
+
+def page(state, key):
+    """render() of profile key, kept until warm-up swaps in new state"""
+    global _pages
+    cached_state, rendered = _pages
+    if cached_state is not state:
+        rendered = {}
+        _pages = (state, rendered)
+    if key not in rendered:
+        rendered[key] = render(state.branding(key))
+    return rendered[key]
+
+
+def _profile_key(state, request):
+    query = parse_qs(urlsplit(request.path).query).get(profiles.QUERY_PARAM, [None])[0]
+    return profiles.select(state.profiles, host=request.headers.get("Host"), query=query)
+
+
+def _redirect(location, headers=None):
+    return 303, {"Location": location, "Cache-Control": "no-store", **(headers or {})}, b""
+
+
+def _not_ready():
+    return 503, {"Content-Type": "text/plain", "Retry-After": "5"}, b"warming up\n"
+
+
+@sidecar.route(LOGIN_PATH, public=True)
+def _login_page(request):
+    if not warmup.is_ready():
+        return _not_ready()
+    headers = {"Content-Type": "text/html; charset=utf-8", "Cache-Control": "no-cache"}
+    state = warmup.warm()
+    return 200, headers, page(state, _profile_key(state, request))
+
+
+@sidecar.route(LOGIN_PATH, methods=("POST",), public=True)
+def _login_submit(request):
+    if not warmup.is_ready():
+        return _not_ready()
+    state = warmup.warm()
+    declared = request.headers.get("Content-Length")
+    if declared is None:
+        return 411, {"Content-Type": "text/plain"}, b"length required\n"
+    try:
+        length = int(declared)
+    except ValueError:
+        length = -1
+    if length < 0:
+        return 400, {"Content-Type": "text/plain"}, b"bad content length\n"
+    if length > MAX_FORM_BYTES:
+        return 413, {"Content-Type": "text/plain"}, b"too large\n"
+    form = parse_qs(request.rfile.read(length).decode("utf-8", "replace"))
+    password = form.get("password", [""])[0]
+
+    key = ratelimit.client_address(request.headers, request.client_address[0])
+    allowed, wait = ratelimit.shared_limiter().attempt(key)
+    if not allowed:
+        metrics.LOGIN_FAILURES.inc(reason="throttled")
+        return _redirect(f"?error=throttled&wait={math.ceil(wait)}")
+    if not auth.verify_password(password, state.password_hash):
+        metrics.LOGIN_FAILURES.inc(reason="password")
+        return _redirect("?error=password")
+
+    metrics.LOGINS.inc()
+    cookie = (f"{auth.COOKIE_NAME}={auth.sign_token(state.auth_secret, ttl=state.cookie_ttl)}; "
+              f"Max-Age={state.cookie_ttl}; Path=/; SameSite=Lax; HttpOnly")
+    if request.headers.get("X-Forwarded-Proto") == "https":
+        cookie += "; Secure"
+    return _redirect(app_url(), {"Set-Cookie": cookie})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--output", type=Path, required=True, help="file to write the page to")
+    parser.add_argument("--action", default="", help="URL the form posts to (default: the page itself)")
+    parser.add_argument("--base", default=None, help="base URL of the app (default: HERD_APP_URL or /)")
+    parser.add_argument("--profile", default=None, help="branding profile (default: the first)")
+    args = parser.parse_args(argv)
+    branding = warmup.warm().branding(args.profile)
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    args.output.write_text(render(branding, action=args.action, base=args.base), encoding="utf-8")
+    print(f"wrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+"""In-process counters and histograms exported in Prometheus text format.
+
+The script wraps each run in ``rerun()`` and each phase in ``span()``;
+``record_bytes()`` is called for every element payload sent to the
+browser. Everything is kept in memory behind one lock and rendered on
+demand by the sidecar's ``/metrics`` route.
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+from herd import sidecar
+
+SECONDS_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+BYTES_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+WAIT_BUCKETS = (1, 5, 15, 30, 60, 120, 300, 600, 1800)
+
+_lock = threading.Lock()
+_local = threading.local()
+
+
+class Counter:
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help = help_text
+        self.values = {}
+
+    def inc(self, amount=1, **labels):
+        key = tuple(sorted(labels.items()))
+        with _lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def samples(self):
+        for key, value in self.values.items():
+            yield self.name, key, value
+
+
+class Gauge(Counter):
+    def set(self, value, **labels):
+        with _lock:
+            self.values[tuple(sorted(labels.items()))] = value
+
+
+class Histogram:
+    def __init__(self, name, help_text, buckets):
+        self.name = name
+        self.help = help_text
+        self.buckets = buckets
+        self.values = {}
+
+    def observe(self, value, **labels):
+        key = tuple(sorted(labels.items()))
+        with _lock:
+            counts, total = self.values.get(key, ([0] * (len(self.buckets) + 1), 0.0))
+            counts[bisect.bisect_left(self.buckets, value)] += 1
+            self.values[key] = (counts, total + value)
+
+    def samples(self):
+        for key, (counts, total) in self.values.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                yield f"{self.name}_bucket", key + (("le", le),), cumulative
+            yield f"{self.name}_sum", key, total
+            yield f"{self.name}_count", key, cumulative
+
+
+RERUN_SECONDS = Histogram("herd_rerun_seconds", "Wall time of a script run", SECONDS_BUCKETS)
+PHASE_SECONDS = Histogram("herd_phase_seconds", "Wall time of a script run phase", SECONDS_BUCKETS)
+RERUN_BYTES = Histogram("herd_rerun_bytes", "Element payload bytes sent per script run", BYTES_BUCKETS)
+ELEMENT_BYTES = Histogram("herd_element_bytes", "Payload bytes per emitted element", BYTES_BUCKETS)
+SESSIONS = Counter("herd_sessions_total", "Sessions started")
+LOGINS = Counter("herd_logins_total", "Successful password logins")
+LOGIN_FAILURES = Counter("herd_login_failures_total", "Rejected login attempts by reason")
+# The widget mounts in the browser, which the server never sees; this counts
+# the placeholders it is mounted from, once per session and agent
+WIDGET_PLACEHOLDERS = Counter("herd_widget_placeholders_total", "Agent widget placeholders rendered")
+ACTIVE_SESSIONS = Gauge("herd_active_sessions", "Admitted sessions")
+SESSION_MEMORY = Gauge("herd_session_memory_bytes", "Estimated session state size of admitted sessions")
+SESSION_EVICTIONS = Counter("herd_session_evictions_total", "Sessions closed for idleness")
+SESSIONS_REJECTED = Counter("herd_sessions_rejected_total", "Runs turned away at capacity")
+EVENTS_WRITTEN = Counter("herd_events_written_total", "Usage events appended to the event log")
+EVENTS_DROPPED = Counter("herd_events_dropped_total", "Usage events lost by reason")
+EVENT_QUEUE = Gauge("herd_event_queue_depth", "Usage events waiting for the writer")
+CONVERSATIONS_ACTIVE = Gauge("herd_conversations_active", "Voice conversation slots held")
+CONVERSATIONS_WAITING = Gauge("herd_conversations_waiting", "Sessions queued for a conversation slot")
+CONVERSATIONS_ENDED = Counter("herd_conversations_ended_total", "Conversation slots released by reason")
+CONVERSATIONS_ABANDONED = Counter("herd_conversations_abandoned_total", "Queued sessions that left by reason")
+CONVERSATION_WAIT_SECONDS = Histogram("herd_conversation_wait_seconds", "Time queued before a slot was granted",
+                                      WAIT_BUCKETS)
+
+REGISTRY = [RERUN_SECONDS, PHASE_SECONDS, RERUN_BYTES, ELEMENT_BYTES,
+            SESSIONS, LOGINS, LOGIN_FAILURES, WIDGET_PLACEHOLDERS,
+            ACTIVE_SESSIONS, SESSION_MEMORY, SESSION_EVICTIONS, SESSIONS_REJECTED,
+            EVENTS_WRITTEN, EVENTS_DROPPED, EVENT_QUEUE,
+            CONVERSATIONS_ACTIVE, CONVERSATIONS_WAITING, CONVERSATIONS_ENDED,
+            CONVERSATIONS_ABANDONED, CONVERSATION_WAIT_SECONDS]
+
+
+@contextmanager
+def rerun(scope="app"):
+    """Time one script run and total the bytes recorded during it.
+
+    scope is "app" for full runs and the fragment name for fragment
+    reruns. Also records when the run ends with st.stop() or st.rerun(),
+    which raise through the block.
+    """
+    _local.bytes = 0
+    _local.phases = {}
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        RERUN_SECONDS.observe(time.perf_counter() - start, scope=scope)
+        RERUN_BYTES.observe(_local.bytes, scope=scope)
+        _local.bytes = None
+
+
+def in_rerun():
+    """True inside a rerun() block on this thread"""
+    return getattr(_local, "bytes", None) is not None
+
+
+@contextmanager
+def span(phase):
+    """Time one phase of the current run"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        PHASE_SECONDS.observe(elapsed, phase=phase)
+        phases = getattr(_local, "phases", None)
+        if phases is not None:
+            phases[phase] = phases.get(phase, 0.0) + elapsed
+
+
+def record_bytes(element, payload):
+    """Count the UTF-8 size of an element payload sent to the browser"""
+    size = len(payload.encode("utf-8"))
+    ELEMENT_BYTES.observe(size, element=element)
+    if getattr(_local, "bytes", None) is not None:
+        _local.bytes += size
+    return size
+
+
+def current_phases():
+    """{phase: seconds} recorded so far in this thread's current run"""
+    return dict(getattr(_local, "phases", None) or {})
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels) + "}"
+
+
+def render(registry=REGISTRY):
+    """Prometheus text exposition of every metric"""
+    lines = []
+    with _lock:
+        for metric in registry:
+            if isinstance(metric, Histogram):
+                kind = "histogram"
+            elif isinstance(metric, Gauge):
+                kind = "gauge"
+            else:
+                kind = "counter"
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {kind}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{_format_labels(labels)} {value}")
+    return "\n".join(lines) + "\n"
+
+
+@sidecar.route("/metrics")
+def _metrics_route(request):
+    return 200, {"Content-Type": "text/plain; version=0.0.4; charset=utf-8"}, render()
@@ -0,0 +1,71 @@
+"""Warm the agent view while the login page is showing.
+
+The login page renders a zero-height component that adds resource hints
+to the parent document: preconnects to the widget origins right away,
+then low-priority prefetches of the agent view's assets once the browser
+is idle. After login the rerun finds the logo, fonts and widget script in
+the HTTP cache and the connections already open.
+"""
+import json
+import re
+from urllib.parse import urlsplit
+
+# The widget talks to the ElevenLabs API once it mounts
+AGENT_ORIGINS = ("https://api.elevenlabs.io",)
+
+_TEMPLATE = """
+<script>
+    (function () {{
+        const doc = window.parent.document;
+        const base = doc.baseURI;
+        function hint(attrs) {{
+            const href = new URL(attrs.href, base).href;
+            if (doc.head.querySelector('link[href="' + href + '"]')) return;
+            const link = doc.createElement('link');
+            for (const [name, value] of Object.entries(attrs)) {{
+                if (value) link.setAttribute(name, name === 'href' ? href : value);
+            }}
+            doc.head.appendChild(link);
+        }}
+        for (const origin of {preconnect}) {{
+            hint({{rel: 'preconnect', href: origin, crossorigin: 'anonymous'}});
+        }}
+        const prefetch = () => {{
+            for (const item of {prefetch}) {{
+                const href = item.hires && window.devicePixelRatio > 1 ? item.hires : item.href;
+                hint({{rel: 'prefetch', href: href, as: item.as, crossorigin: item.crossorigin,
+                       integrity: item.integrity, fetchpriority: 'low'}});
+            }}
+        }};
+        if ('requestIdleCallback' in window) {{
+            requestIdleCallback(prefetch, {{timeout: 5000}});
+        }} else {{
+            setTimeout(prefetch, 2000);
+        }}
+    }})();
+</script>
+"""
+
+
+def origin(url):
+    """scheme://host[:port] of an absolute URL, or None for relative URLs"""
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}" if parts.scheme and parts.netloc else None
+
+
+def script_hint(src, integrity=None):
+    """Prefetch entry for a script later loaded with crossorigin=anonymous"""
+    return {"href": src, "as": "script", "crossorigin": "anonymous" if integrity else None,
+            "integrity": integrity}
+
+
+def image_hint(href, hires=None):
+    """Prefetch entry for an image; hires is used on high-density screens"""
+    return {"href": href, "as": "image", "hires": hires}
+
+
+def warmup_html(preconnect, prefetch):
+    """Script that adds preconnect and idle-time prefetch hints to the page"""
+    script = _TEMPLATE.format(preconnect=json.dumps(list(preconnect)), prefetch=json.dumps(list(prefetch)))
+    # Drop indentation; this is sent on every login page run
+    return re.sub(r"\n\s+", "\n", script)
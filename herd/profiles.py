@@ -0,0 +1,158 @@
+"""Branding profiles for running several shows from one deployment.
+
+A profile names a show's title, copy, background, logo, fonts, theme
+tokens and agents, and the hostnames or path prefixes it is served under.
+Profiles come from the ``[profiles.<key>]`` tables of the shared config;
+without any, the built-in Herd AI branding is the only profile.
+
+Each profile's compiled stylesheets and hints are a ``Branding``. They are
+built on first use and kept in a ``BrandingCache``, a bounded LRU, so a
+deployment with many shows holds only the recently used ones in memory.
+Profiles marked ``warm`` are built during warm-up.
+"""
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field, fields
+from urllib.parse import urlsplit
+
+from herd.theme import BACKGROUND_IMAGE, FONT_FACES
+
+DEFAULT_KEY = "herd"
+DEFAULT_CACHE_SIZE = 8
+
+# Query parameter that picks a profile explicitly, e.g. for previews
+QUERY_PARAM = "show"
+
+# Login copy, overridden by [copy] and [profiles.<key>.copy]
+DEFAULT_COPY = {
+    "password_placeholder": "Enter password",
+    "login_button": "▸ LOGIN",
+    "password_error": "❌ Incorrect password. Please try again.",
+    "throttle_error": "Too many login attempts. Please wait {seconds} seconds.",
+}
+
+
+@dataclass(frozen=True)
+class Profile:
+    key: str
+    title: str = "Herd AI"
+    page_icon: str = "🦊"
+    login_footer: tuple = ("© 2025 Fox Sports. All rights reserved.",
+                           "FIFA World Cup 2026™ Official Broadcaster")
+    footer: tuple = ("© 2025 Fox Sports • FIFA World Cup 2026™ Official Broadcaster",
+                     "Powered by ElevenLabs AI Technology")
+    background: str = BACKGROUND_IMAGE
+    logo: str = "fox-sports.jpg"
+    fonts: tuple = FONT_FACES
+    agents: tuple = ()  # keys of [agents.*]; empty means every agent
+    theme: dict = field(default_factory=dict)
+    copy: dict = field(default_factory=lambda: dict(DEFAULT_COPY))
+    hosts: tuple = ()
+    paths: tuple = ()
+    warm: bool = False
+
+    @property
+    def assets(self):
+        """Asset names the profile's pages link to directly"""
+        return {self.background, self.logo, *(name for _, name in self.fonts)}
+
+
+@dataclass(frozen=True)
+class Branding:
+    """Everything a session renders that depends on its profile"""
+    profile: Profile
+    bundles: dict
+    agents: dict
+    warmup_html: str
+
+
+def _profile(key, table, base_theme, base_copy):
+    # The key is the table's name, so it cannot be set inside the table
+    unknown = set(table) - ({f.name for f in fields(Profile)} - {"key"})
+    if unknown:
+        raise ValueError(f"Profile {key} sets unknown keys: {', '.join(sorted(unknown))}")
+    table = dict(table)
+    if "fonts" in table:
+        table["fonts"] = tuple(sorted((int(weight), name) for weight, name in table["fonts"].items()))
+    for name in ("login_footer", "footer", "agents", "hosts", "paths"):
+        if name in table:
+            table[name] = tuple(table[name])
+    table["hosts"] = tuple(host.lower() for host in table.get("hosts", ()))
+    # Per-view token overrides on top of the config's top-level [theme]
+    merged = {view: dict(tokens) for view, tokens in base_theme.items()}
+    for view, tokens in table.pop("theme", {}).items():
+        merged.setdefault(view, {}).update(tokens)
+    copy = {**DEFAULT_COPY, **base_copy, **table.pop("copy", {})}
+    unknown = set(copy) - set(DEFAULT_COPY)
+    if unknown:
+        raise ValueError(f"Profile {key} sets unknown copy: {', '.join(sorted(unknown))}")
+    return Profile(key=key, theme=merged, copy=copy, **table)
+
+
+def from_config(config, agents):
+    """{key: Profile} from [profiles.*], in config order; the first is the default"""
+    base_theme = config.get("theme", {})
+    base_copy = config.get("copy", {})
+    tables = config.get("profiles") or {DEFAULT_KEY: {"warm": True}}
+    profiles = {key: _profile(key, table, base_theme, base_copy) for key, table in tables.items()}
+    for profile in profiles.values():
+        unknown = set(profile.agents) - set(agents)
+        if unknown:
+            raise ValueError(f"Profile {profile.key} lists unknown agents: {', '.join(sorted(unknown))}")
+    return profiles
+
+
+def select(profiles, host=None, url=None, query=None):
+    """Key of the profile for a request: ?show=, then hostname, then path prefix"""
+    if query in profiles:
+        return query
+    hostname = (host or "").split(":", 1)[0].lower()
+    path = urlsplit(url).path if url else ""
+    best, best_length = None, -1
+    for key, profile in profiles.items():
+        if hostname and hostname in profile.hosts:
+            return key
+        for prefix in profile.paths:
+            if path.startswith(prefix) and len(prefix) > best_length:
+                best, best_length = key, len(prefix)
+    return best or next(iter(profiles))
+
+
+def agents_for(profile, agents):
+    """The profile's agents in its listed order, or every agent"""
+    if not profile.agents:
+        return agents
+    return {key: agents[key] for key in profile.agents}
+
+
+class BrandingCache:
+    """LRU of Branding by profile key, holding at most maxsize entries"""
+
+    def __init__(self, build, maxsize=DEFAULT_CACHE_SIZE):
+        self.build = build
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            branding = self._entries.get(key)
+            if branding is not None:
+                self._entries.move_to_end(key)
+                return branding
+        # Build outside the lock; two sessions racing for a cold profile
+        # both compile it and the later result wins
+        branding = self.build(key)
+        with self._lock:
+            self._entries[key] = branding
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return branding
+
+    def keys(self):
+        with self._lock:
+            return list(self._entries)
+
+    def __len__(self):
+        return len(self._entries)
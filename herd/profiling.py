@@ -0,0 +1,167 @@
+"""Opt-in cProfile capture of script runs, for operators chasing slow reruns.
+
+Capture is off unless asked for, and a run that is not captured only pays
+for one query parameter lookup. It is switched on either
+
+- for every run, with ``HERD_PROFILE=1``, or
+- for the runs of one session, by opening the app with
+  ``?profile=<HERD_PROFILE_TOKEN>``. Without a token set the parameter is
+  ignored.
+
+Each captured run writes ``<stamp>-<session>-<scope>.prof`` (pstats format)
+and a ``.json`` next to it with the session ID, the run's wall time and its
+phase breakdown. They go to ``HERD_PROFILE_DIR`` (default logs/profiles),
+which keeps only the newest ``HERD_PROFILE_KEEP`` captures (default 50).
+
+    python -m herd.profiling [--top 25] [--sort tottime] [--session ID]
+
+summarizes the hotspots and phase times across the captured runs.
+"""
+import argparse
+import cProfile
+import contextlib
+import hmac
+import json
+import logging
+import os
+import pstats
+import time
+from pathlib import Path
+
+from herd import metrics
+from herd.config import ROOT
+
+DEFAULT_DIR = ROOT / "logs" / "profiles"
+DEFAULT_KEEP = 50
+QUERY_PARAM = "profile"
+
+_LOGGER = logging.getLogger(__name__)
+
+
+def profile_dir():
+    return Path(os.environ.get("HERD_PROFILE_DIR") or DEFAULT_DIR)
+
+
+def keep():
+    """How many captures HERD_PROFILE_KEEP retains (default 50)"""
+    return int(os.environ.get("HERD_PROFILE_KEEP", DEFAULT_KEEP))
+
+
+def requested(query_value=None):
+    """Whether to profile this run: HERD_PROFILE is on, or query_value is the token"""
+    if os.environ.get("HERD_PROFILE", "").lower() in ("1", "true", "on"):
+        return True
+    token = os.environ.get("HERD_PROFILE_TOKEN")
+    if not token or not query_value:
+        return False
+    return hmac.compare_digest(query_value.encode(), token.encode())
+
+
+def capture_if(enabled, session_id, scope="app"):
+    """capture() when enabled, otherwise a no-op context"""
+    return capture(session_id, scope) if enabled else contextlib.nullcontext()
+
+
+@contextlib.contextmanager
+def capture(session_id, scope="app", directory=None):
+    """Profile the block and write it out, also when it ends with st.stop()
+    or st.rerun(). Use inside metrics.rerun() to record the phase times."""
+    profiler = cProfile.Profile()
+    start = time.perf_counter()
+    try:
+        profiler.enable()
+    except ValueError:
+        # Python 3.12+ allows one active profiler per process, so a run that
+        # overlaps another session's capture goes unprofiled
+        _LOGGER.warning("Not profiling session %s: another capture is running", session_id)
+        yield
+        return
+    try:
+        yield
+    finally:
+        profiler.disable()
+        info = {
+            "ts": round(time.time(), 3),
+            "session": session_id,
+            "scope": scope,
+            "seconds": round(time.perf_counter() - start, 6),
+            "phases": {phase: round(seconds, 6) for phase, seconds in metrics.current_phases().items()},
+        }
+        try:
+            _write(profiler, info, Path(directory) if directory else profile_dir())
+        except OSError:
+            _LOGGER.exception("Writing a profile of session %s failed", session_id)
+
+
+def _write(profiler, info, directory):
+    directory.mkdir(parents=True, exist_ok=True)
+    millis = int(info["ts"] * 1000) % 1000
+    stamp = time.strftime("%Y%m%dT%H%M%S", time.gmtime(info["ts"])) + f"{millis:03d}"
+    session = "".join(ch for ch in str(info["session"])[:8] if ch.isalnum()) or "none"
+    base = directory / f"{stamp}-{session}-{info['scope']}"
+    profiler.dump_stats(str(base.with_suffix(".prof")))
+    base.with_suffix(".json").write_text(json.dumps(info), encoding="utf-8")
+    _rotate(directory, keep())
+
+
+def _rotate(directory, retain):
+    """Delete all but the newest retain captures"""
+    captures = sorted(directory.glob("*.prof"))
+    for old in captures[:max(len(captures) - retain, 0)]:
+        old.unlink(missing_ok=True)
+        old.with_suffix(".json").unlink(missing_ok=True)
+
+
+def load(directory=None, session=None):
+    """[(info, .prof path)] of the captured runs, oldest first"""
+    runs = []
+    for path in sorted((Path(directory) if directory else profile_dir()).glob("*.prof")):
+        try:
+            info = json.loads(path.with_suffix(".json").read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            info = {}
+        if session and not str(info.get("session", "")).startswith(session):
+            continue
+        runs.append((info, path))
+    return runs
+
+
+def phase_summary(runs):
+    """{phase: (runs, mean seconds, max seconds)} across runs"""
+    times = {}
+    for info, _ in runs:
+        for phase, seconds in info.get("phases", {}).items():
+            times.setdefault(phase, []).append(seconds)
+    return {phase: (len(values), sum(values) / len(values), max(values))
+            for phase, values in times.items()}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--dir", type=Path, default=None, help="capture directory (default: HERD_PROFILE_DIR)")
+    parser.add_argument("--session", default=None, help="only runs of sessions with this ID prefix")
+    parser.add_argument("--sort", default="cumulative", choices=("cumulative", "tottime", "ncalls"),
+                        help="hotspot order")
+    parser.add_argument("--top", type=int, default=25, help="hotspots to list")
+    args = parser.parse_args(argv)
+
+    runs = load(args.dir, args.session)
+    if not runs:
+        print(f"no captured runs in {args.dir or profile_dir()}")
+        return
+    seconds = [info["seconds"] for info, _ in runs if "seconds" in info]
+    print(f"{len(runs)} runs, {len({info.get('session') for info, _ in runs})} sessions")
+    if seconds:
+        print(f"wall time: mean {sum(seconds) / len(seconds) * 1000:.2f} ms, "
+              f"max {max(seconds) * 1000:.2f} ms")
+    print()
+    print(f"{'phase':<16}{'runs':>6}{'mean ms':>10}{'max ms':>10}")
+    for phase, (count, mean, worst) in sorted(phase_summary(runs).items(), key=lambda item: -item[1][1]):
+        print(f"{phase:<16}{count:>6}{mean * 1000:>10.2f}{worst * 1000:>10.2f}")
+    print()
+    stats = pstats.Stats(*(str(path) for _, path in runs))
+    stats.strip_dirs().sort_stats(args.sort).print_stats(args.top)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,126 @@
+"""Token-bucket rate limiting for login attempts.
+
+Every attempt spends one token from the client's bucket and one from a
+global bucket. The per-client bucket stops a single address from guessing
+quickly; the global one sheds load when many addresses hammer the form at
+once, before any password hashing happens. Client buckets live in an LRU
+map with a hard size limit so a flood of addresses cannot grow memory.
+
+Clients are keyed by the address of the peer that connected. Behind
+reverse proxies, set ``HERD_TRUSTED_PROXY_HOPS`` to how many of them append
+to ``X-Forwarded-For``; the address just before those hops is used.
+Without it the header is ignored, because clients can send any value.
+A client without a usable address (no peer, or a loopback peer, which is a
+proxy on the same host) gets no bucket of its own and only spends from the
+global one, so one visitor's guesses cannot lock everyone else out.
+"""
+import ipaddress
+import os
+import threading
+import time
+from collections import OrderedDict
+
+import streamlit as st
+
+
+class TokenBucket:
+    """Holds up to capacity tokens, refilled at rate tokens per second"""
+
+    __slots__ = ("capacity", "rate", "tokens", "updated")
+
+    def __init__(self, capacity, rate, now):
+        self.capacity = capacity
+        self.rate = rate
+        self.tokens = float(capacity)
+        self.updated = now
+
+    def refill(self, now):
+        elapsed = max(0.0, now - self.updated)
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+        self.updated = now
+
+    def retry_after(self):
+        """Seconds until one token is available, as of the last refill"""
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+
+class LoginRateLimiter:
+    """Per-client and global token buckets guarding the login form"""
+
+    def __init__(self, per_client=(5, 0.1), overall=(50, 10.0), max_clients=10_000,
+                 clock=time.monotonic):
+        self.per_client = per_client
+        self.max_clients = max_clients
+        self.clock = clock
+        self._global = TokenBucket(*overall, now=clock())
+        self._clients = OrderedDict()
+        self._lock = threading.Lock()
+
+    def attempt(self, key):
+        """Spend a token for key, or only a global one if key is None;
+        return (allowed, seconds to wait if not)"""
+        with self._lock:
+            now = self.clock()
+            buckets = [self._global]
+            if key is not None:
+                bucket = self._clients.pop(key, None)
+                if bucket is None:
+                    bucket = TokenBucket(*self.per_client, now=now)
+                self._clients[key] = bucket
+                while len(self._clients) > self.max_clients:
+                    self._clients.popitem(last=False)
+                buckets.append(bucket)
+
+            for bucket in buckets:
+                bucket.refill(now)
+            if any(bucket.tokens < 1 for bucket in buckets):
+                return False, max(bucket.retry_after() for bucket in buckets)
+            for bucket in buckets:
+                bucket.tokens -= 1
+            return True, 0.0
+
+    def __len__(self):
+        return len(self._clients)
+
+
+_shared = None
+_shared_lock = threading.Lock()
+
+
+def shared_limiter():
+    """The process-wide limiter for every login form the process serves"""
+    global _shared
+    with _shared_lock:
+        if _shared is None:
+            _shared = LoginRateLimiter()
+        return _shared
+
+
+def trusted_hops():
+    """How many reverse proxies in front append to X-Forwarded-For (HERD_TRUSTED_PROXY_HOPS)"""
+    return max(int(os.environ.get("HERD_TRUSTED_PROXY_HOPS") or 0), 0)
+
+
+def client_address(headers, peer, hops=None):
+    """Client address: the X-Forwarded-For entry added by the outermost of
+    hops trusted proxies, counting from the right; else the socket peer.
+    None if there is no peer or it is a loopback address."""
+    hops = trusted_hops() if hops is None else hops
+    forwarded = headers.get("X-Forwarded-For") if hops else None
+    if forwarded:
+        entries = [entry.strip() for entry in forwarded.split(",") if entry.strip()]
+        if entries:
+            return entries[-min(hops, len(entries))]
+    if not isinstance(peer, str) or not peer:
+        return None
+    try:
+        if ipaddress.ip_address(peer).is_loopback:
+            return None
+    except ValueError:
+        pass
+    return peer
+
+
+def client_key():
+    """client_address() of the current session"""
+    return client_address(st.context.headers, st.context.ip_address)
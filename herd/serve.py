@@ -0,0 +1,41 @@
+"""Run the app with the sidecar up and warm-up started before Streamlit.
+
+    python -m herd.serve [streamlit run options]
+
+``streamlit run app.py`` still works, but then nothing is built until the
+first session arrives and /ready stays 503 until then. Here the sidecar
+answers /healthz and /ready from the start, warm-up runs alongside
+Streamlit's own startup, and Streamlit runs in this process so the app
+reuses the warmed state.
+
+Streamlit's file watcher and run-on-save are turned off whatever the
+config file says; options passed here still override that. Send SIGHUP to
+reload herd.toml and assets/ without a restart.
+"""
+import signal
+import sys
+
+from herd import loginpage, sidecar, warmup  # noqa: F401  loginpage registers /login
+from herd.config import ROOT
+
+APP = ROOT / "app.py"
+
+# Production defaults, ahead of the caller's options so those win
+PRODUCTION_OPTIONS = ("--server.fileWatcherType=none", "--server.runOnSave=false")
+
+
+def main(argv=None):
+    args = sys.argv[1:] if argv is None else list(argv)
+    sidecar.start()
+    warmup.warm_in_background()
+    if hasattr(signal, "SIGHUP"):
+        signal.signal(signal.SIGHUP, lambda signum, frame: warmup.request_reload())
+
+    from streamlit.web import cli
+
+    sys.argv = ["streamlit", "run", str(APP), *PRODUCTION_OPTIONS, *args]
+    return cli.main()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+"""Admission control and idle eviction for Streamlit sessions.
+
+Every script run reports its session to a process-wide ``SessionManager``.
+It records last activity (the last script run) and an estimate of the
+session state's memory. A background thread periodically forgets sessions
+whose browser has gone and closes sessions idle past the timeout. New
+sessions beyond ``max_sessions`` are turned away so the app can show a
+small "at capacity" page instead of the full UI.
+
+An idle session is not closed silently: its browser is first sent
+``?expired=1`` as the page's query string, then the websocket is closed.
+The browser reconnects into a new session, which sees the parameter and
+shows a "session expired" page until the user continues.
+"""
+import asyncio
+import contextlib
+import logging
+import os
+import sys
+import threading
+import time
+from dataclasses import dataclass
+from urllib.parse import parse_qsl, urlencode
+
+from streamlit import runtime
+from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+DEFAULT_MAX_SESSIONS = 200
+DEFAULT_IDLE_TIMEOUT = 30 * 60
+SWEEP_INTERVAL = 30
+# Query parameter an evicted browser comes back with
+EXPIRED_PARAM = "expired"
+# Seconds for the query string update to reach the browser before the close
+_CLOSE_GRACE = 0.5
+
+_LOGGER = logging.getLogger(__name__)
+
+
+@dataclass
+class SessionInfo:
+    started: float
+    last_seen: float
+    memory_bytes: int = 0
+    query_string: str = ""
+
+
+def current_session_id():
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx else None
+
+
+def estimate_size(obj, _seen=None, _depth=0):
+    """Rough deep size of obj in bytes, following containers a few levels down"""
+    _seen = _seen if _seen is not None else set()
+    if id(obj) in _seen or _depth > 4:
+        return 0
+    _seen.add(id(obj))
+    size = sys.getsizeof(obj, 0)
+    if isinstance(obj, dict):
+        size += sum(estimate_size(k, _seen, _depth + 1) + estimate_size(v, _seen, _depth + 1)
+                    for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(estimate_size(item, _seen, _depth + 1) for item in obj)
+    return size
+
+
+def is_connected(session_id):
+    """Whether session_id still has a browser attached (always True outside a server)"""
+    return not runtime.exists() or runtime.get_instance().is_active_session(session_id)
+
+
+def expired_query(query_string):
+    """query_string with EXPIRED_PARAM set, other parameters kept"""
+    params = [(k, v) for k, v in parse_qsl(query_string, keep_blank_values=True) if k != EXPIRED_PARAM]
+    return urlencode(params + [(EXPIRED_PARAM, "1")])
+
+
+async def _expire(instance, session_id, query_string):
+    client = instance.get_client(session_id)
+    if client is not None:
+        msg = ForwardMsg()
+        msg.page_info_changed.query_string = expired_query(query_string)
+        with contextlib.suppress(Exception):  # already disconnected
+            client.write_forward_msg(msg)
+    instance.close_session(session_id)
+    if client is None:
+        return
+    await asyncio.sleep(_CLOSE_GRACE)
+    try:
+        websocket = getattr(client, "_websocket", None)  # Starlette server
+        if websocket is not None:
+            await websocket.close(code=1000, reason="session expired")
+        elif hasattr(client, "close"):  # Tornado server
+            client.close()
+    except Exception:  # the browser left meanwhile
+        _LOGGER.debug("closing the connection of session %s failed", session_id, exc_info=True)
+
+
+def _close_runtime_session(session_id, query_string=""):
+    """Tell the browser its session expired, shut the session down and close
+    the connection, on the runtime's event loop; best effort"""
+    if not runtime.exists():
+        return
+    instance = runtime.get_instance()
+    try:
+        loop = instance._get_async_objs().eventloop
+    except Exception:  # internal API; may change between Streamlit releases
+        _LOGGER.debug("cannot close session %s: runtime event loop unavailable", session_id)
+        return
+    asyncio.run_coroutine_threadsafe(_expire(instance, session_id, query_string), loop)
+
+
+class SessionManager:
+    """Tracks sessions, evicts idle ones and enforces a session cap"""
+
+    def __init__(self, max_sessions=DEFAULT_MAX_SESSIONS, idle_timeout=DEFAULT_IDLE_TIMEOUT,
+                 sweep_interval=SWEEP_INTERVAL, clock=time.monotonic,
+                 is_active=is_connected, close=_close_runtime_session, on_end=None):
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.sweep_interval = sweep_interval
+        self.clock = clock
+        self.is_active = is_active
+        self.close = close  # called as close(session_id, query_string) for idle sessions
+        self.on_end = on_end  # called as on_end(session_id, info, reason) when a session leaves
+        self.evictions = 0
+        self._sessions = {}
+        self._lock = threading.Lock()
+        self._sweeper = None
+
+    @classmethod
+    def from_env(cls, **kwargs):
+        """Limits from HERD_MAX_SESSIONS and HERD_SESSION_IDLE_TIMEOUT (seconds)"""
+        idle_timeout = float(os.environ.get("HERD_SESSION_IDLE_TIMEOUT", DEFAULT_IDLE_TIMEOUT))
+        return cls(
+            max_sessions=int(os.environ.get("HERD_MAX_SESSIONS", DEFAULT_MAX_SESSIONS)),
+            idle_timeout=idle_timeout,
+            sweep_interval=min(SWEEP_INTERVAL, idle_timeout),
+            **kwargs,
+        )
+
+    def start(self):
+        """Sweep every sweep_interval seconds in a daemon thread, so idle
+        sessions are closed even while no script runs; idempotent"""
+        with self._lock:
+            if self._sweeper is None:
+                self._sweeper = threading.Thread(target=self._sweep_forever, name="herd-session-sweep",
+                                                 daemon=True)
+                self._sweeper.start()
+        return self
+
+    def _sweep_forever(self):
+        while True:
+            time.sleep(self.sweep_interval)
+            try:
+                self.sweep()
+            except Exception:
+                _LOGGER.exception("session sweep failed")
+
+    def admit(self, session_id, state=None, query_string=None):
+        """Record activity for session_id; False if it is new and the app is full.
+        query_string is the page's, restored with EXPIRED_PARAM if it is evicted."""
+        now = self.clock()
+        memory = estimate_size(dict(state)) if state is not None else 0
+        with self._lock:
+            info = self._sessions.get(session_id)
+            if info is None:
+                if len(self._sessions) >= self.max_sessions:
+                    return False
+                info = self._sessions[session_id] = SessionInfo(started=now, last_seen=now)
+            info.last_seen = now
+            info.memory_bytes = memory
+            if query_string is not None:
+                info.query_string = query_string
+            return True
+
+    def sweep(self):
+        """Drop disconnected sessions and close idle ones; return the evicted ids"""
+        now = self.clock()
+        with self._lock:
+            gone = [sid for sid in self._sessions if not self.is_active(sid)]
+            idle = [sid for sid, info in self._sessions.items()
+                    if sid not in gone and now - info.last_seen > self.idle_timeout]
+            ended = [(sid, self._sessions.pop(sid), "disconnected") for sid in gone]
+            ended += [(sid, self._sessions.pop(sid), "idle") for sid in idle]
+            self.evictions += len(idle)
+        for sid, info, reason in ended:
+            if reason == "idle":
+                self.close(sid, info.query_string)
+        for sid, info, reason in ended:
+            self._ended(sid, info, reason)
+        return idle
+
+    def _ended(self, session_id, info, reason):
+        if self.on_end is None:
+            return
+        try:
+            self.on_end(session_id, info, reason)
+        except Exception:
+            _LOGGER.exception("on_end callback failed for session %s", session_id)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "sessions": len(self._sessions),
+                "memory_bytes": sum(info.memory_bytes for info in self._sessions.values()),
+                "evictions": self.evictions,
+            }
@@ -0,0 +1,132 @@
+"""Small HTTP server that runs beside Streamlit for routes it cannot host.
+
+Streamlit does not let an app add HTTP routes, so they are served from
+stdlib ``ThreadingHTTPServer`` listeners started once per process. Modules
+register handlers with ``route()``; a handler receives the request handler
+object and returns ``(status, headers, body)``.
+
+There are two listeners. The operator one (``HERD_SIDECAR_ADDRESS`` /
+``HERD_SIDECAR_PORT``, default ``127.0.0.1:9108``) answers ``/metrics``,
+``/ready`` and ``/healthz``, which reveal internals and belong to the
+monitoring network. Routes registered with ``public=True`` (the login page,
+``/assets/`` and ``/vendor/``) are answered only by the public listener
+(``HERD_PUBLIC_ADDRESS`` / ``HERD_PUBLIC_PORT``, default ``127.0.0.1:9109``),
+which a reverse proxy can expose. Both stay on loopback unless the
+operator sets an address.
+"""
+import logging
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_ADDRESS = "127.0.0.1"
+DEFAULT_PORT = 9108
+DEFAULT_PUBLIC_PORT = 9109
+
+_LOGGER = logging.getLogger(__name__)
+# Keyed by whether the route is public
+_routes = {False: {}, True: {}}
+_prefix_routes = {False: [], True: []}
+_servers = {}
+_server_lock = threading.Lock()
+
+
+def route(path, methods=("GET",), prefix=False, public=False):
+    """Register the decorated function for path, or every path under it if prefix.
+
+    public routes are served by the public listener, the others by the
+    operator listener only.
+    """
+    def register(handler):
+        for method in methods:
+            if prefix:
+                _prefix_routes[public].append((method, path, handler))
+            else:
+                _routes[public][(method, path)] = handler
+        return handler
+    return register
+
+
+def _find(method, path, public=False):
+    handler = _routes[public].get((method, path))
+    if handler is None:
+        for route_method, route_prefix, prefix_handler in _prefix_routes[public]:
+            if route_method == method and path.startswith(route_prefix):
+                return prefix_handler
+    return handler
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "herd-sidecar"
+    # Seconds a stalled client may hold a thread while its request is read
+    timeout = 10
+
+    def _dispatch(self, method):
+        path = self.path.split("?", 1)[0]
+        # HEAD runs the GET handler; the body is dropped below
+        handler = _find("GET" if method == "HEAD" else method, path, self.server.public)
+        if handler is None:
+            status, headers, body = 404, {"Content-Type": "text/plain"}, b"not found\n"
+        else:
+            try:
+                status, headers, body = handler(self)
+            except Exception:
+                _LOGGER.exception("sidecar handler for %s %s failed", method, path)
+                status, headers, body = 500, {"Content-Type": "text/plain"}, b"error\n"
+        if isinstance(body, str):
+            body = body.encode("utf-8")
+        self.send_response(status)
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if method != "HEAD":
+            self.wfile.write(body)
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_HEAD(self):
+        self._dispatch("HEAD")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def log_message(self, format, *args):
+        _LOGGER.debug("%s - %s", self.address_string(), format % args)
+
+
+def _listen(name, address, port, public):
+    with _server_lock:
+        if name in _servers:
+            return _servers[name]
+        try:
+            server = ThreadingHTTPServer((address, port), _Handler)
+        except OSError as exc:
+            _LOGGER.warning("%s sidecar not started on %s:%s: %s", name, address, port, exc)
+            return None
+        server.daemon_threads = True
+        server.public = public
+        _servers[name] = server
+        threading.Thread(target=server.serve_forever, name=f"herd-sidecar-{name}", daemon=True).start()
+        _LOGGER.info("%s sidecar listening on %s:%s", name, address, server.server_port)
+        return server
+
+
+def start(address=None, port=None, public_address=None, public_port=None):
+    """Start both listeners in daemon threads unless they already run; return
+    the operator one, or None
+
+    address and port default to HERD_SIDECAR_ADDRESS and HERD_SIDECAR_PORT,
+    public_address and public_port to HERD_PUBLIC_ADDRESS and
+    HERD_PUBLIC_PORT. Port 0 disables a listener.
+    """
+    address = address or os.environ.get("HERD_SIDECAR_ADDRESS", DEFAULT_ADDRESS)
+    public_address = public_address or os.environ.get("HERD_PUBLIC_ADDRESS", DEFAULT_ADDRESS)
+    if port is None:
+        port = int(os.environ.get("HERD_SIDECAR_PORT", DEFAULT_PORT))
+    if public_port is None:
+        public_port = int(os.environ.get("HERD_PUBLIC_PORT", DEFAULT_PUBLIC_PORT))
+    if public_port:
+        _listen("public", public_address, public_port, public=True)
+    return _listen("operator", address, port, public=False) if port else None
@@ -0,0 +1,225 @@
+"""Conversation slots for the voice widget, shared by every session.
+
+The ElevenLabs plan caps concurrent agent conversations. With
+``HERD_MAX_CONVERSATIONS`` set, a session asks the ``SlotBroker`` for a
+slot before its widget is mounted. While every slot is taken, sessions
+wait in a first-come queue and are shown their position and an estimated
+wait.
+
+Holders and waiters keep their place by polling at least every ``lease``
+seconds. A tab that stops polling because it was closed, put to sleep or
+went offline loses its place. A conversation also ends after ``max_hold``
+seconds. Sessions whose browser disconnected are released on the next
+broker call of the process that serves them.
+
+The broker state lives in memory for one process, or in a JSON file
+locked with ``flock`` (``HERD_CONVERSATION_STORE``). The file shares one
+cap between replicas on the same host or volume.
+"""
+import contextlib
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+try:
+    import fcntl
+except ImportError:  # Windows; only the in-memory store is available
+    fcntl = None
+
+from herd import metrics
+
+DEFAULT_LEASE = 60
+DEFAULT_MAX_HOLD = 15 * 60
+# Expected conversation length until some conversations have ended
+DEFAULT_HOLD_ESTIMATE = 3 * 60
+# How often a holding or waiting tab polls; well inside the lease
+POLL_INTERVAL = 5
+_ESTIMATE_WEIGHT = 0.2
+
+
+@dataclass(frozen=True)
+class Ticket:
+    """A session's place: status is "granted", "waiting" or "none" """
+    status: str
+    agent: str = None
+    position: int = 0  # 1-based, while waiting
+    eta: float = 0.0  # estimated seconds until granted, while waiting
+    remaining: float = 0.0  # seconds left of the conversation, while granted
+
+
+NO_TICKET = Ticket("none")
+
+
+def _empty():
+    return {"holders": {}, "queue": [], "hold_estimate": DEFAULT_HOLD_ESTIMATE}
+
+
+class MemoryStore:
+    """Broker state for a single process"""
+
+    def __init__(self):
+        self._state = _empty()
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def transaction(self):
+        with self._lock:
+            yield self._state
+
+
+class FileStore:
+    """Broker state in a JSON file, shared by every process that opens it.
+
+    A transaction holds an exclusive flock on ``<path>.lock`` while it reads
+    the state and writes it back with an atomic replace.
+    """
+
+    def __init__(self, path):
+        if fcntl is None:
+            raise RuntimeError("HERD_CONVERSATION_STORE needs fcntl, which this platform lacks")
+        self.path = Path(path)
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def transaction(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._lock, open(f"{self.path}.lock", "a") as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                state = json.loads(self.path.read_text(encoding="utf-8"))
+            except (FileNotFoundError, ValueError):
+                state = _empty()
+            yield state
+            tmp = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(state), encoding="utf-8")
+            os.replace(tmp, self.path)
+
+
+class SlotBroker:
+    """At most capacity concurrent conversations, the rest queued in order"""
+
+    def __init__(self, capacity, lease=DEFAULT_LEASE, max_hold=DEFAULT_MAX_HOLD, store=None,
+                 clock=time.time, is_active=None):
+        self.capacity = capacity
+        self.lease = lease
+        self.max_hold = max_hold
+        self.store = store or MemoryStore()
+        self.clock = clock  # wall time, so processes sharing a FileStore agree
+        # is_active(holder) -> False once the holder's browser is gone; only
+        # asked about holders this process added
+        self.is_active = is_active
+        self._pid = os.getpid()
+
+    @classmethod
+    def from_env(cls, **kwargs):
+        """Broker for HERD_MAX_CONVERSATIONS slots; None if it is unset or 0"""
+        capacity = int(os.environ.get("HERD_MAX_CONVERSATIONS") or 0)
+        if capacity <= 0:
+            return None
+        path = os.environ.get("HERD_CONVERSATION_STORE")
+        return cls(
+            capacity,
+            lease=float(os.environ.get("HERD_CONVERSATION_LEASE", DEFAULT_LEASE)),
+            max_hold=float(os.environ.get("HERD_CONVERSATION_MAX_SECONDS", DEFAULT_MAX_HOLD)),
+            store=FileStore(path) if path else None,
+            **kwargs,
+        )
+
+    def request(self, holder, agent):
+        """Ask for a slot to talk to agent; queues holder if none is free.
+        A holder that already has a slot or a place keeps it."""
+        with self._session() as (state, now):
+            if holder not in state["holders"] and not any(w["id"] == holder for w in state["queue"]):
+                state["queue"].append({"id": holder, "agent": agent, "joined": now, "seen": now,
+                                       "pid": self._pid})
+            return self._refresh(state, holder, now)
+
+    def poll(self, holder):
+        """Renew holder's lease and return its current Ticket"""
+        with self._session() as (state, now):
+            return self._refresh(state, holder, now)
+
+    def release(self, holder, reason="ended"):
+        """Give up holder's slot or place in the queue; False if it had neither"""
+        with self._session() as (state, now):
+            found = self._remove(state, holder, now, reason)
+            self._promote(state, now)
+            return found
+
+    def stats(self):
+        with self._session() as (state, now):
+            return {"capacity": self.capacity, "active": len(state["holders"]),
+                    "waiting": len(state["queue"])}
+
+    @contextlib.contextmanager
+    def _session(self):
+        with self.store.transaction() as state:
+            now = self.clock()
+            self._expire(state, now)
+            yield state, now
+            metrics.CONVERSATIONS_ACTIVE.set(len(state["holders"]))
+            metrics.CONVERSATIONS_WAITING.set(len(state["queue"]))
+
+    def _refresh(self, state, holder, now):
+        self._promote(state, now)
+        entry = state["holders"].get(holder)
+        if entry is not None:
+            entry["seen"] = now
+            return Ticket("granted", entry["agent"], remaining=max(0.0, entry["granted"] + self.max_hold - now))
+        for index, waiter in enumerate(state["queue"]):
+            if waiter["id"] == holder:
+                waiter["seen"] = now
+                return Ticket("waiting", waiter["agent"], position=index + 1,
+                              eta=self._eta(state, index, now))
+        return NO_TICKET
+
+    def _expire(self, state, now):
+        for holder, entry in list(state["holders"].items()):
+            if now - entry["granted"] > self.max_hold:
+                self._remove(state, holder, now, "time_limit")
+            elif now - entry["seen"] > self.lease:
+                self._remove(state, holder, now, "idle")
+            elif self._disconnected(holder, entry):
+                self._remove(state, holder, now, "disconnected")
+        for waiter in list(state["queue"]):
+            if now - waiter["seen"] > self.lease:
+                self._remove(state, waiter["id"], now, "idle")
+            elif self._disconnected(waiter["id"], waiter):
+                self._remove(state, waiter["id"], now, "disconnected")
+
+    def _disconnected(self, holder, entry):
+        return self.is_active is not None and entry.get("pid") == self._pid and not self.is_active(holder)
+
+    def _remove(self, state, holder, now, reason):
+        entry = state["holders"].pop(holder, None)
+        if entry is not None:
+            held = min(now - entry["granted"], self.max_hold)
+            state["hold_estimate"] += _ESTIMATE_WEIGHT * (held - state["hold_estimate"])
+            metrics.CONVERSATIONS_ENDED.inc(reason=reason)
+            return True
+        queued = [w for w in state["queue"] if w["id"] != holder]
+        if len(queued) == len(state["queue"]):
+            return False
+        state["queue"] = queued
+        metrics.CONVERSATIONS_ABANDONED.inc(reason=reason)
+        return True
+
+    def _promote(self, state, now):
+        while state["queue"] and len(state["holders"]) < self.capacity:
+            waiter = state["queue"].pop(0)
+            state["holders"][waiter["id"]] = {"agent": waiter["agent"], "granted": now, "seen": now,
+                                              "pid": waiter.get("pid")}
+            metrics.CONVERSATION_WAIT_SECONDS.observe(now - waiter["joined"])
+
+    def _eta(self, state, index, now):
+        """Seconds until queue[index] is granted, from the expected end of each
+        current conversation and the typical conversation length"""
+        estimate = min(state["hold_estimate"], self.max_hold)
+        ends = sorted(max(entry["granted"] + estimate, now) - now
+                      for entry in state["holders"].values())
+        rounds, slot = divmod(index, self.capacity)
+        first = ends[slot] if slot < len(ends) else 0.0
+        return first + rounds * estimate
@@ -0,0 +1,761 @@
+"""Compile the app stylesheet into one minified bundle per view.
+
+The stylesheet only varies with the view (login or authenticated) and the
+published asset URLs, so both bundles are built once per process and the
+script emits the finished string on each rerun. Each bundle carries the
+lite-mode rules, scoped under ``LITE_CLASS``, which ``LITE_PROBE`` sets
+on low-power devices.
+"""
+import re
+
+from herd import images as image_variants
+
+VIEWS = ("login", "authenticated")
+
+FONT_FACES = (
+    (300, "fonts/industry-font/IndustryTest-Light.otf"),
+    (400, "fonts/industry-font/IndustryTest-Book.otf"),
+    (500, "fonts/industry-font/IndustryTest-Medium.otf"),
+    (600, "fonts/industry-font/IndustryTest-Demi.otf"),
+)
+
+BACKGROUND_IMAGE = "TheHerd_Final_wide.png"
+
+_VIEW_TOKENS = {
+    "login": {
+        "background_overlay": "linear-gradient(rgba(0,21,41,0.3), rgba(0,0,0,0.4))",
+        "h1_background": "#FFFFFF",
+        "h1_accent": "#FFFFFF",
+        "h1_accent_opacity": "1",
+        "footer_background": "transparent",
+        "footer_border": "none",
+        "main_padding_bottom": "6rem",
+    },
+    "authenticated": {
+        "background_overlay": "linear-gradient(rgba(0,21,41,0.85), rgba(0,0,0,0.95))",
+        "h1_background": "linear-gradient(135deg, #FFFFFF 0%, #E0E0E0 100%)",
+        "h1_accent": "linear-gradient(90deg, #FFFFFF, #E0E0E0)",
+        "h1_accent_opacity": "0.6",
+        "footer_background": "rgba(0, 21, 41, 0.9)",
+        "footer_border": "1px solid rgba(255, 255, 255, 0.1)",
+        "main_padding_bottom": "1rem",
+    },
+}
+
+
+def _font_faces(urls, fonts, font_faces):
+    """@font-face rules; with a WOFF2 subset from herd.fonts the OTF is only
+    declared for the glyphs the subset lacks, so it is fetched only for those"""
+    rules = []
+    for weight, name in font_faces:
+        subset = fonts.get(name)
+        woff2_url = subset and urls.get(subset["woff2"])
+        otf_url = urls.get(name)
+        if otf_url and not woff2_url:
+            rules.append(_font_face(weight, f"url(\"{otf_url}\") format('opentype')"))
+        elif otf_url and subset.get("fallback_range"):
+            rules.append(_font_face(
+                weight,
+                f"url(\"{otf_url}\") format('opentype')",
+                f"unicode-range: {subset['fallback_range']};",
+            ))
+        if woff2_url:
+            rules.append(_font_face(
+                weight,
+                f"url(\"{woff2_url}\") format('woff2')",
+                f"unicode-range: {subset['unicode_range']};",
+            ))
+    return "".join(rules)
+
+
+def _font_face(weight, src, extra=""):
+    return f"""
+@font-face {{
+    font-family: 'Industry';
+    font-weight: {weight};
+    font-style: normal;
+    font-display: swap;
+    src: {src};
+    {extra}
+}}
+"""
+
+
+def _responsive_background(overlay, urls, images, background):
+    """Swap the full-size background for WebP variants sized to the viewport.
+
+    image-set() with type() is dropped by browsers that do not support it,
+    which then keep the original image from the background shorthand.
+    """
+    variants = image_variants.variants(images, background)
+    if not variants:
+        return ""
+
+    def image_set(width):
+        candidates, seen = [], set()
+        for density in (1, 2):
+            url = urls.get(image_variants.pick(variants, width * density)["path"])
+            if url and url not in seen:
+                seen.add(url)
+                candidates.append(f'url("{url}") type("image/webp") {density}x')
+        return f"{overlay}, image-set({', '.join(candidates)})"
+
+    widths = [v["width"] for v in variants]
+    rules = [f".stApp {{ background-image: {image_set(widths[-1])}; }}"]
+    # Widest first so narrower breakpoints win
+    for width in reversed(widths[:-1]):
+        rules.append(f"@media (max-width: {width}px) {{ .stApp {{ background-image: {image_set(width)}; }} }}")
+    return "\n".join(rules) + "\n"
+
+
+def view_tokens(view, overrides=None):
+    """Stylesheet tokens for view with overrides[view] applied"""
+    tokens = dict(_VIEW_TOKENS[view])
+    extra = (overrides or {}).get(view, {})
+    unknown = set(extra) - set(tokens)
+    if unknown:
+        raise ValueError(f"Unknown theme tokens for {view}: {', '.join(sorted(unknown))}")
+    tokens.update(extra)
+    return tokens
+
+
+def _base_css(view, urls, fonts, images, tokens, background, font_faces):
+    bg_image = urls.get(background)
+    if bg_image:
+        background = f'{tokens["background_overlay"]}, url("{bg_image}") center/cover fixed'
+        responsive = _responsive_background(tokens["background_overlay"], urls, images, background)
+    else:
+        background = "linear-gradient(rgba(0,21,41,0.95), rgba(0,0,0,0.98))"
+        responsive = ""
+    return _font_faces(urls, fonts, font_faces) + f"""
+/* Global font settings */
+* {{
+    font-family: 'Industry', -apple-system, BlinkMacSystemFont, 'Segoe UI', sans-serif !important;
+}}
+
+body {{
+    font-family: 'Industry', -apple-system, BlinkMacSystemFont, 'Segoe UI', sans-serif !important;
+    font-weight: 400;
+}}
+
+/* Hide Streamlit elements */
+#MainMenu, footer, header, .stDeployButton {{visibility: hidden;}}
+
+/* Background styling - simplified */
+.stApp {{
+    background: {background};
+}}
+{responsive}
+/* Headers - Polished typography */
+h1 {{
+    background: {tokens['h1_background']};
+    -webkit-background-clip: text;
+    -webkit-text-fill-color: transparent;
+    background-clip: text;
+    font-family: 'Industry', -apple-system, BlinkMacSystemFont, 'Segoe UI', sans-serif;
+    font-weight: 600;
+    text-align: center;
+    font-size: clamp(3.5rem, 5vw, 4.5rem);
+    margin-bottom: 1rem;
+    letter-spacing: 0.1em;
+    line-height: 1.2;
+    position: relative;
+    padding-bottom: 0.5rem;
+    filter: drop-shadow(0 3px 6px rgba(0, 0, 0, 0.8));
+    transition: all 0.3s ease;
+}}
+
+
+/* Hover effect for h1 */
+h1:hover {{
+    transform: scale(1.02);
+    filter: drop-shadow(0 4px 6px rgba(0, 0, 0, 0.8));
+}}
+
+/* Subtle underline accent */
+h1::after {{
+    content: '';
+    position: absolute;
+    bottom: 0;
+    left: 50%;
+    transform: translateX(-50%);
+    width: 80px;
+    height: 2px;
+    background: {tokens['h1_accent']};
+    border-radius: 2px;
+    opacity: {tokens['h1_accent_opacity']};
+}}
+
+/* Login container - REMOVED - form elements now appear directly on background */
+
+/* Button styling */
+.stButton > button {{
+    background: linear-gradient(135deg, #0084FF 0%, #0066CC 100%);
+    color: white;
+    border: none;
+    padding: 1.2rem 4rem;
+    font-weight: 600;
+    border-radius: 10px;
+    text-transform: uppercase;
+    transition: all 0.3s ease;
+    font-family: 'Industry', -apple-system, BlinkMacSystemFont, 'Segoe UI', sans-serif;
+    letter-spacing: 0.12em;
+    font-size: 1.3rem;
+    box-shadow: 0 6px 20px rgba(0, 0, 0, 0.5);
+}}
+
+.stButton > button:hover {{
+    background: linear-gradient(135deg, #0066CC 0%, #0052A3 100%);
+    transform: translateY(-2px);
+    box-shadow: 0 8px 25px rgba(0, 0, 0, 0.6);
+}}
+
+/* Input field styling */
+.stTextInput > div > div > input {{
+    border-radius: 10px !important;
+    border: 2px solid rgba(255, 255, 255, 0.4) !important;
+    padding: 1.2rem 1.5rem !important;
+    background: rgba(255, 255, 255, 0.9) !important;
+    color: #000000 !important;
+    font-family: 'Industry', -apple-system, BlinkMacSystemFont, 'Segoe UI', sans-serif !important;
+    font-size: 1.2rem !important;
+    font-weight: 500 !important;
+    letter-spacing: 0.04em !important;
+    transition: all 0.3s ease !important;
+    backdrop-filter: blur(20px) !important;
+    box-shadow: 0 8px 32px rgba(0, 0, 0, 0.3) !important;
+    -webkit-text-fill-color: #000000 !important;
+}}
+
+.stTextInput > div > div > input:focus {{
+    border-color: rgba(0, 132, 255, 0.8) !important;
+    outline: none !important;
+    background: rgba(255, 255, 255, 1) !important;
+    box-shadow: 0 0 0 3px rgba(0, 132, 255, 0.3), 0 8px 32px rgba(0, 0, 0, 0.4) !important;
+}}
+
+.stTextInput > div > div > input::placeholder {{
+    color: rgba(0, 0, 0, 0.5) !important;
+    font-family: 'Industry', -apple-system, BlinkMacSystemFont, 'Segoe UI', sans-serif !important;
+    font-weight: 400 !important;
+    -webkit-text-fill-color: rgba(0, 0, 0, 0.5) !important;
+}}
+
+/* Input field wrapper */
+.stTextInput > div {{
+    background: transparent !important;
+    position: relative !important;
+}}
+
+/* Password visibility toggle button */
+.stTextInput > div > div > button {{
+    background: transparent !important;
+    border: none !important;
+    color: rgba(0, 0, 0, 0.6) !important;
+    right: 1rem !important;
+    position: absolute !important;
+    top: 50% !important;
+    transform: translateY(-50%) !important;
+}}
+
+.stTextInput > div > div > button:hover {{
+    color: rgba(0, 0, 0, 0.9) !important;
+}}
+
+/* Footer - improved contrast */
+.footer {{
+    position: fixed;
+    bottom: 0;
+    left: 0;
+    right: 0;
+    background: {tokens['footer_background']};
+    backdrop-filter: blur(10px);
+    padding: 1rem 0;
+    text-align: center;
+    color: rgba(255,255,255,0.9);
+    font-size: 1rem;
+    font-family: 'Industry', -apple-system, BlinkMacSystemFont, 'Segoe UI', sans-serif;
+    letter-spacing: 0.03em;
+    border-top: {tokens['footer_border']};
+    z-index: 100;
+}}
+
+/* Fixed footer for login page */
+.login-footer {{
+    position: fixed;
+    bottom: 0;
+    left: 0;
+    right: 0;
+    background: transparent;
+    padding: 1.5rem 0;
+    text-align: center;
+    color: rgba(255,255,255,1);
+    font-size: 1rem;
+    font-weight: 500;
+    font-family: 'Industry', -apple-system, BlinkMacSystemFont, 'Segoe UI', sans-serif;
+    letter-spacing: 0.03em;
+    z-index: 100;
+    text-shadow: 0 2px 6px rgba(0, 0, 0, 1), 0 0 20px rgba(0, 0, 0, 0.8);
+}}
+
+.login-footer span {{
+    font-size: 0.9rem;
+    opacity: 0.9;
+}}
+
+/* Authenticated view styling */
+.main-header {{
+    text-align: center;
+    margin-bottom: 0.25rem;
+}}
+
+.main-header img {{
+    margin: 0.25rem 0;
+    width: 120px;
+}}
+
+.widget-container {{
+    display: flex;
+    justify-content: center;
+    align-items: center;
+    width: 100%;
+    padding: 1rem 0;
+}}
+
+/* Error message styling */
+.stAlert {{
+    background: rgba(255, 68, 68, 0.2);
+    border: 2px solid rgba(255, 68, 68, 0.5);
+    border-radius: 10px;
+    color: rgba(255, 255, 255, 1);
+    font-family: 'Industry', -apple-system, BlinkMacSystemFont, 'Segoe UI', sans-serif;
+    backdrop-filter: blur(12px);
+    box-shadow: 0 4px 20px rgba(0, 0, 0, 0.5);
+    max-width: 500px;
+    margin: 1rem auto 0 auto;
+}}
+
+/* Form container styling */
+.stForm {{
+    background: transparent;
+    max-width: 500px;
+    margin: 0 auto;
+}}
+
+/* Hide default form help text */
+.stForm > div[data-testid="stFormSubmitButton"] > div > div > small {{
+    display: none !important;
+}}
+
+/* Form submit area */
+.stForm [data-testid="stFormSubmitButton"] {{
+    margin-top: 0 !important;
+}}
+
+/* Additional button icon removal */
+.stButton > button > div {{
+    display: flex;
+    justify-content: center;
+    align-items: center;
+}}
+
+
+/* Add padding to bottom when footer is fixed */
+.main > div {{
+    padding-bottom: {tokens['main_padding_bottom']};
+}}
+"""
+
+
+# Layout overrides for the agent view, layered over the base stylesheet
+_AUTHENTICATED_CSS = """
+/* Main content area optimization */
+.stApp > div {
+    padding-bottom: 6rem !important;
+}
+
+/* Container max width for better full-screen layout */
+.main .block-container {
+    max-width: 1600px !important;
+    padding-left: 3rem !important;
+    padding-right: 3rem !important;
+    padding-top: 0.5rem !important;
+}
+
+/* Optimize main content padding */
+.main > div {
+    padding-top: 0.5rem !important;
+}
+
+/* Make markdown headers visible with improved sizing */
+h3 {
+    color: #FFFFFF !important;
+    font-size: 1.8rem !important;
+    font-weight: 600 !important;
+    margin-bottom: 0.5rem !important;
+    margin-top: 0 !important;
+    padding-top: 0 !important;
+    text-shadow: 0 2px 6px rgba(0, 0, 0, 0.9) !important;
+    transition: all 0.3s ease !important;
+    cursor: default !important;
+    position: relative !important;
+    display: inline-block !important;
+    font-family: 'Industry', -apple-system, BlinkMacSystemFont, 'Segoe UI', sans-serif !important;
+    letter-spacing: 0.05em !important;
+    white-space: nowrap !important;
+}
+
+/* Hover effect for extra polish */
+h3:hover {
+    transform: translateY(-1px) !important;
+    text-shadow: 0 3px 8px rgba(0, 0, 0, 1) !important;
+}
+
+/* Make italic descriptions visible with better sizing */
+p em {
+    color: rgba(255, 255, 255, 0.9) !important;
+    font-style: normal !important;
+    font-size: 1.2rem !important;
+    display: block;
+    margin-bottom: 1.2rem;
+    margin-top: 0.2rem;
+    line-height: 1.4;
+    font-family: 'Industry', -apple-system, BlinkMacSystemFont, 'Segoe UI', sans-serif !important;
+    font-weight: 400 !important;
+    letter-spacing: 0.02em !important;
+    text-shadow: 0 1px 4px rgba(0, 0, 0, 0.8) !important;
+}
+
+/* Hide horizontal rule dividers */
+hr {
+    display: none !important;
+}
+
+/* Remove Streamlit default spacing */
+.element-container {
+    margin: 0 !important;
+    padding: 0 !important;
+}
+
+.stMarkdown {
+    margin: 0 !important;
+    padding: 0 !important;
+}
+
+.stMarkdown p {
+    margin: 0 !important;
+    padding: 0 !important;
+}
+
+/* Optimize iframe container for full-screen experience */
+iframe {
+    margin: 0 !important;
+    padding: 0 !important;
+    display: block !important;
+    border-radius: 12px !important;
+}
+
+.stComponent {
+    margin: 0 !important;
+    padding: 0 !important;
+}
+
+/* Tight spacing for widget sections */
+div[data-testid="stVerticalBlock"] > div {
+    gap: 0 !important;
+}
+
+/* Widget container with better styling */
+div[data-testid="stVerticalBlock"] {
+    background: rgba(0, 33, 66, 0.5) !important;
+    border-radius: 16px !important;
+    border: 1px solid rgba(255, 255, 255, 0.2) !important;
+    backdrop-filter: blur(8px) !important;
+    padding: 2.5rem 3rem !important;
+    box-shadow: 0 8px 32px rgba(0, 0, 0, 0.5) !important;
+    max-width: 1500px !important;
+    margin: 0 auto !important;
+}
+
+/* Center align content */
+div[data-testid="stVerticalBlock"] > div > div {
+    text-align: center;
+}
+
+/* Responsive design for smaller screens */
+@media (max-width: 1024px) {
+    .main .block-container {
+        padding-left: 1.5rem !important;
+        padding-right: 1.5rem !important;
+    }
+    
+    div[data-testid="stVerticalBlock"] {
+        padding: 1.5rem !important;
+    }
+    
+    h3 {
+        font-size: 1.5rem !important;
+    }
+    
+    p em {
+        font-size: 1rem !important;
+    }
+    
+    h1 {
+        font-size: clamp(2.5rem, 4vw, 3.5rem) !important;
+    }
+}
+
+/* Extra large screens optimization */
+@media (min-width: 1920px) {
+    .main .block-container {
+        max-width: 1800px !important;
+    }
+    
+    div[data-testid="stVerticalBlock"] {
+        max-width: 1700px !important;
+    }
+}
+"""
+
+
+# Class set on the page's root element when lite mode is on
+LITE_CLASS = "herd-lite"
+# ?lite=1 forces lite mode, ?lite=0 forces the full effects
+LITE_PARAM = "lite"
+
+# Lite mode for low-power displays: no blur, shadows, transitions or hover
+# motion, and a background that scrolls with the page instead of being
+# composited as a fixed layer
+_LITE_CSS = """
+.herd-lite *, .herd-lite *::before, .herd-lite *::after {
+    backdrop-filter: none !important;
+    -webkit-backdrop-filter: none !important;
+    box-shadow: none !important;
+    transition: none !important;
+    animation: none !important;
+}
+
+/* The blurred panels set their effects with !important on selectors more
+   specific than .herd-lite *, so they are matched at least as closely */
+.herd-lite .stTextInput > div > div > input,
+.herd-lite .stTextInput > div > div > input:focus,
+.herd-lite div[data-testid="stVerticalBlock"] {
+    backdrop-filter: none !important;
+    -webkit-backdrop-filter: none !important;
+    box-shadow: none !important;
+    transition: none !important;
+}
+
+.herd-lite .stApp {
+    background-attachment: scroll !important;
+}
+
+.herd-lite img, .herd-lite h1, .herd-lite h1:hover {
+    filter: none !important;
+}
+
+.herd-lite h1:hover, .herd-lite h3:hover, .herd-lite .stButton > button:hover {
+    transform: none !important;
+}
+"""
+
+# Sets LITE_CLASS from ?lite=, else from prefers-reduced-motion or a probe
+# of the device; runs in a component iframe or directly in the static page
+LITE_PROBE = """
+<script>
+    (function () {
+        const root = window.parent.document.documentElement;
+        const forced = new URLSearchParams(window.parent.location.search).get('%(param)s');
+        let lite;
+        if (forced === '0' || forced === '1') {
+            lite = forced === '1';
+        } else {
+            const connection = navigator.connection || {};
+            lite = window.matchMedia('(prefers-reduced-motion: reduce)').matches
+                || connection.saveData === true
+                || (navigator.hardwareConcurrency || 8) <= 2
+                || (navigator.deviceMemory || 8) <= 2;
+        }
+        root.classList.toggle('%(cls)s', lite);
+    })();
+</script>
+""" % {"param": LITE_PARAM, "cls": LITE_CLASS}
+
+
+def stylesheet(view, urls, fonts=None, images=None, overrides=None,
+               background=BACKGROUND_IMAGE, font_faces=FONT_FACES):
+    """Unminified CSS for a view, given {asset name: url}, fonts.json,
+    images.json, theme token overrides and a profile's background and fonts"""
+    if view not in _VIEW_TOKENS:
+        raise ValueError(f"Unknown view: {view!r}")
+    tokens = view_tokens(view, overrides)
+    css = _base_css(view, urls, fonts or {}, images or {}, tokens, background, font_faces)
+    if view == "authenticated":
+        css += _AUTHENTICATED_CSS
+    return css + _LITE_CSS
+
+
+def build_bundles(urls, fonts=None, images=None, overrides=None,
+                  background=BACKGROUND_IMAGE, font_faces=FONT_FACES):
+    """Return {view: "<style>...</style>"} for every view"""
+    return {
+        view: "<style>{}</style>".format(compile_css(
+            stylesheet(view, urls, fonts, images, overrides, background, font_faces)))
+        for view in VIEWS
+    }
+
+
+def compile_css(css):
+    """Minify css and merge repeated selectors within the same block"""
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    return _serialize(_merge(_parse(css)))
+
+
+def _parse(css):
+    """Split css into [(prelude, body)] at the top level"""
+    rules, depth, start, prelude = [], 0, 0, ""
+    for i, ch in enumerate(css):
+        if ch == "{":
+            if depth == 0:
+                prelude, start = css[start:i], i + 1
+            depth += 1
+        elif ch == "}":
+            depth -= 1
+            if depth == 0:
+                rules.append((_squash(prelude), css[start:i]))
+                start = i + 1
+    return rules
+
+
+def _merge(rules):
+    """Fold rules that share a selector into the last occurrence.
+
+    A rule is only folded when no rule between the two sets a property that
+    overlaps one of its own, since moving its declarations past that rule
+    would change which one wins. At-rule blocks are kept in place; @media
+    bodies are merged recursively and @font-face (or any other at-rule) is
+    never combined with its peers.
+    """
+    merged = []
+    positions = {}
+    for prelude, body in rules:
+        if prelude.startswith("@media") or prelude.startswith("@supports"):
+            merged.append((prelude, _merge(_parse(body))))
+        elif prelude.startswith("@"):
+            merged.append((prelude, _declarations(body)))
+        else:
+            selector = re.sub(r"\s*([>,])\s*", r"\1", prelude)
+            declarations = _declarations(body)
+            position = positions.get(selector)
+            if position is not None:
+                previous = merged[position][1]
+                if not _crosses(previous, merged[position + 1:]):
+                    merged[position] = None
+                    declarations = _override(previous, declarations)
+            positions[selector] = len(merged)
+            merged.append((selector, declarations))
+    return [rule for rule in merged if rule is not None]
+
+
+# Shorthands whose longhands do not start with the shorthand's name
+_SHORTHANDS = {
+    "inset": ("top", "right", "bottom", "left"),
+    "gap": ("row-gap", "column-gap"),
+    "font": ("line-height",),
+    "grid-area": ("grid-row-start", "grid-column-start", "grid-row-end", "grid-column-end"),
+    "place-items": ("align-items", "justify-items"),
+    "place-content": ("align-content", "justify-content"),
+    "place-self": ("align-self", "justify-self"),
+}
+
+
+def _unprefixed(prop):
+    return re.sub(r"^-(webkit|moz|ms|o)-", "", prop)
+
+
+def _overlaps(a, b):
+    """Whether properties a and b can set the same value (same property,
+    shorthand and longhand, or vendor-prefixed alias)"""
+    a, b = _unprefixed(a), _unprefixed(b)
+    return (a == b or a.startswith(b + "-") or b.startswith(a + "-")
+            or a in _SHORTHANDS.get(b, ()) or b in _SHORTHANDS.get(a, ()))
+
+
+def _crosses(declarations, rules):
+    """Whether any style rule in rules sets a property overlapping declarations"""
+    for rule in rules:
+        if rule is None:
+            continue
+        prelude, body = rule
+        if isinstance(body, list):
+            if _crosses(declarations, body):
+                return True
+        elif not prelude.startswith("@") and any(
+                _overlaps(prop, other) for prop in declarations for other in body):
+            return True
+    return False
+
+
+def _declarations(body):
+    """Parse a declaration block into {property: (value, important)}"""
+    result = {}
+    for item in _split(body, ";"):
+        if ":" not in item:
+            continue
+        prop, value = (part.strip() for part in item.split(":", 1))
+        important = value.endswith("!important")
+        if important:
+            value = value[: -len("!important")].rstrip()
+        result = _override(result, {prop.lower(): (_squash(value), important)})
+    return result
+
+
+def _override(old, new):
+    """Apply later declarations over earlier ones, honouring !important"""
+    result = dict(old)
+    for prop, (value, important) in new.items():
+        if prop in result and result[prop][1] and not important:
+            continue
+        result.pop(prop, None)
+        result[prop] = (value, important)
+    return result
+
+
+def _split(text, sep):
+    """Split on sep outside of quotes and parentheses"""
+    parts, depth, quote, start = [], 0, None, 0
+    for i, ch in enumerate(text):
+        if quote:
+            if ch == quote:
+                quote = None
+        elif ch in "'\"":
+            quote = ch
+        elif ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+        elif ch == sep and depth == 0:
+            parts.append(text[start:i])
+            start = i + 1
+    parts.append(text[start:])
+    return [part.strip() for part in parts if part.strip()]
+
+
+def _squash(text):
+    text = re.sub(r"\s+", " ", text).strip()
+    return re.sub(r",\s+", ",", text)
+
+
+def _serialize(rules):
+    out = []
+    for prelude, body in rules:
+        if isinstance(body, list):
+            out.append(f"{prelude}{{{_serialize(body)}}}")
+        else:
+            decls = ";".join(
+                f"{prop}:{value}{'!important' if important else ''}"
+                for prop, (value, important) in body.items()
+            )
+            out.append(f"{prelude}{{{decls}}}")
+    return "".join(out)
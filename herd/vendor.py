@@ -0,0 +1,170 @@
+"""Vendor a pinned copy of the convai widget embed bundle.
+
+``python -m herd.vendor --version X.Y.Z`` downloads
+``@elevenlabs/convai-widget-embed@X.Y.Z`` (or copies ``--source``, e.g. the
+offline fixture in ``benchmarks/fixtures``) into ``static/vendor`` under a
+content-hashed name. It writes gzip and, when the brotli module is
+installed, brotli copies, and records the SRI hash in ``vendor.json``.
+
+The widget loads the vendored file from Streamlit's own static route
+(``app/static/vendor/``), checked against the integrity hash. The
+Tornado server of older Streamlit releases sends ``.js`` there as
+``text/plain`` with ``nosniff``; under it, or when ``HERD_VENDOR_DIR`` is
+outside ``static/``, the pinned version loads from unpkg with the same
+hash. The public sidecar listener also serves the bundle at ``/vendor/``
+with precompressed bodies and immutable caching; set ``HERD_VENDOR_URL``
+to the address that reaches that route to use it instead.
+"""
+import argparse
+import base64
+import gzip
+import hashlib
+import importlib.util
+import json
+import os
+import sys
+import urllib.request
+from pathlib import Path
+
+from herd import sidecar
+from herd.assets import STATIC_DIR, content_hash
+
+PACKAGE = "@elevenlabs/convai-widget-embed"
+NAME = "convai-widget-embed"
+VENDOR_DIR = Path(os.environ.get("HERD_VENDOR_DIR") or STATIC_DIR / "vendor")
+MANIFEST = VENDOR_DIR / "vendor.json"
+CDN_URL = "https://unpkg.com/{package}@{version}"
+STATIC_URL = "app/static"
+
+_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+def integrity(data):
+    """Subresource Integrity value for data"""
+    return "sha384-" + base64.b64encode(hashlib.sha384(data).digest()).decode()
+
+
+def fetch(source):
+    """Bytes from a local path or an http(s) URL"""
+    if source.startswith(("http://", "https://")):
+        with urllib.request.urlopen(source, timeout=60) as response:
+            return response.read()
+    return Path(source).read_bytes()
+
+
+def vendor(version, source=None, dest_dir=VENDOR_DIR):
+    """Store the bundle and its compressed copies; return the manifest entry"""
+    cdn_url = CDN_URL.format(package=PACKAGE, version=version)
+    data = fetch(source or cdn_url)
+    filename = f"{NAME}@{version}.{content_hash(data)}.js"
+    dest_dir.mkdir(parents=True, exist_ok=True)
+    (dest_dir / filename).write_bytes(data)
+    entry = {
+        "package": PACKAGE,
+        "version": version,
+        "file": filename,
+        "integrity": integrity(data),
+        # A local --source (e.g. the fixture) has no CDN equivalent
+        "cdn_url": cdn_url if source in (None, cdn_url) else None,
+        "bytes": len(data),
+    }
+
+    gz = gzip.compress(data, compresslevel=9, mtime=0)
+    (dest_dir / f"{filename}.gz").write_bytes(gz)
+    entry["gzip_bytes"] = len(gz)
+    try:
+        import brotli
+    except ImportError:
+        print("brotli not installed; skipping the .br copy", file=sys.stderr)
+    else:
+        br = brotli.compress(data, quality=11)
+        (dest_dir / f"{filename}.br").write_bytes(br)
+        entry["br_bytes"] = len(br)
+
+    manifest = load_manifest(dest_dir / MANIFEST.name)
+    previous = manifest.get(NAME, {}).get("file")
+    manifest[NAME] = entry
+    (dest_dir / MANIFEST.name).write_text(json.dumps(manifest, indent=2, sort_keys=True) + "\n")
+    if previous and previous != filename:
+        for suffix in ("", ".gz", ".br"):
+            (dest_dir / f"{previous}{suffix}").unlink(missing_ok=True)
+    return entry
+
+
+def load_manifest(path=MANIFEST):
+    """Return vendor.json, or {} when nothing has been vendored"""
+    try:
+        return json.loads(path.read_text())
+    except FileNotFoundError:
+        return {}
+
+
+def static_serves_scripts():
+    """Whether Streamlit's static route sends .js with a script type; the
+    Tornado server (streamlit.web.server.app_static_file_handler) does not"""
+    return importlib.util.find_spec("streamlit.web.server.app_static_file_handler") is None
+
+
+def _static_url(entry):
+    path = VENDOR_DIR / entry["file"]
+    if STATIC_DIR not in path.parents or not static_serves_scripts():
+        return None
+    return f"{STATIC_URL}/{path.relative_to(STATIC_DIR).as_posix()}"
+
+
+def widget_script(manifest=None, base_url=None):
+    """(src, integrity) for the widget embed script
+
+    Prefers the vendored copy behind HERD_VENDOR_URL, then the vendored copy
+    on Streamlit's static route, then the pinned CDN URL, and falls back to
+    the unpinned CDN URL when nothing is vendored.
+    """
+    entry = (manifest if manifest is not None else load_manifest()).get(NAME)
+    if not entry:
+        return f"https://unpkg.com/{PACKAGE}", None
+    base_url = base_url if base_url is not None else os.environ.get("HERD_VENDOR_URL")
+    if base_url:
+        return f"{base_url.rstrip('/')}/vendor/{entry['file']}", entry["integrity"]
+    static_url = _static_url(entry)
+    if static_url:
+        return static_url, entry["integrity"]
+    if entry.get("cdn_url"):
+        return entry["cdn_url"], entry["integrity"]
+    return f"https://unpkg.com/{PACKAGE}", None
+
+
+@sidecar.route("/vendor/", prefix=True, public=True)
+def _vendor_route(request):
+    name = request.path.split("?", 1)[0][len("/vendor/"):]
+    path = VENDOR_DIR / name
+    if "/" in name or not name.endswith(".js") or not path.is_file():
+        return 404, {"Content-Type": "text/plain"}, b"not found\n"
+    headers = {
+        "Content-Type": "application/javascript; charset=utf-8",
+        "Cache-Control": "public, max-age=31536000, immutable",
+        "Access-Control-Allow-Origin": "*",
+        "Vary": "Accept-Encoding",
+    }
+    accepted = request.headers.get("Accept-Encoding", "")
+    for encoding, suffix in _ENCODINGS:
+        compressed = path.with_name(path.name + suffix)
+        if encoding in accepted and compressed.is_file():
+            headers["Content-Encoding"] = encoding
+            return 200, headers, compressed.read_bytes()
+    return 200, headers, path.read_bytes()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--version", required=True, help=f"{PACKAGE} version to pin")
+    parser.add_argument("--source", help="local file or URL to vendor instead of unpkg")
+    args = parser.parse_args(argv)
+
+    entry = vendor(args.version, args.source)
+    print(f"{entry['file']}: {entry['bytes']} bytes, gzip {entry['gzip_bytes']}"
+          + (f", br {entry['br_bytes']}" if "br_bytes" in entry else ""))
+    print(f"integrity: {entry['integrity']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+"""Process-wide state built once, before or at the first session.
+
+Everything here is derived from files every replica ships with (assets/,
+the font and image manifests, the shared config) plus configured secrets,
+so replicas behind a load balancer build identical state and any of them
+can serve any request. The sidecar reports /ready only once it is built.
+
+    python -m herd.warmup
+
+builds it once and reports it, which publishes static/assets ahead of
+time (the Dockerfile bakes them into the image) and fails on a bad config.
+"""
+import argparse
+import json
+import logging
+import os
+import threading
+import time
+from collections.abc import Mapping
+from dataclasses import dataclass
+
+from herd import agents, assets, auth, config, fonts, images, prefetch, profiles, sidecar, theme, vendor
+
+_LOGGER = logging.getLogger(__name__)
+
+# Seconds between checks of assets/ and the config file for changes; 0
+# turns checks off, leaving request_reload() (SIGHUP under herd.serve)
+DEFAULT_CHECK_INTERVAL = 2.0
+
+
+@dataclass(frozen=True)
+class State:
+    config: Mapping
+    font_manifest: dict
+    image_manifest: dict
+    urls: assets.AssetStore
+    missing_assets: list
+    agents: dict
+    profiles: dict
+    brandings: profiles.BrandingCache
+    widget_script: tuple
+    auth_secret: str
+    password_hash: str
+    cookie_ttl: int
+    seconds: float
+
+    def asset_url(self, name):
+        """Cache-busted static URL for a file under assets/, or None if missing"""
+        return self.urls.get(name)
+
+    def branding(self, key=None):
+        """Compiled branding of profile key, default the first profile"""
+        return self.brandings.get(key or next(iter(self.profiles)))
+
+
+_lock = threading.Lock()
+_state = None
+_error = None
+_checked_at = 0.0
+_reload_requested = threading.Event()
+# Config file stamp as of the last build attempt, so a broken edit is
+# reported once rather than retried every check
+_attempted_stamp = None
+_reload_error = None
+
+
+def check_interval():
+    return float(os.environ.get("HERD_ASSET_CHECK_INTERVAL", DEFAULT_CHECK_INTERVAL))
+
+
+def cache_size():
+    return int(os.environ.get("HERD_PROFILE_CACHE_SIZE", profiles.DEFAULT_CACHE_SIZE))
+
+
+def referenced_assets(font_manifest, image_manifest, profile_list):
+    """Every asset the stylesheets and pages of any profile link to"""
+    names = set()
+    for profile in profile_list:
+        names.update(profile.assets)
+        for _, face in profile.fonts:
+            if face in font_manifest:
+                names.add(font_manifest[face]["woff2"])
+        for name in (profile.background, profile.logo):
+            names.update(variant["path"] for variant in images.variants(image_manifest, name))
+    return names
+
+
+def _warmup_html(urls, image_manifest, script, logo):
+    """Resource hints the login page adds so the agent view loads from cache"""
+    script_src, integrity = script
+    preconnect = [o for o in (prefetch.origin(script_src), *prefetch.AGENT_ORIGINS) if o]
+    hints = [prefetch.script_hint(script_src, integrity)]
+    logo_variants = images.variants(image_manifest, logo)
+    if logo_variants:
+        hints.append(prefetch.image_hint(
+            urls.get(images.pick(logo_variants, 100)["path"]),
+            urls.get(images.pick(logo_variants, 200)["path"]),
+        ))
+    elif urls.get(logo):
+        hints.append(prefetch.image_hint(urls[logo]))
+    return prefetch.warmup_html(preconnect, hints)
+
+
+def _branding(profile, urls, font_manifest, image_manifest, agent_map, script):
+    """Compile one profile's stylesheets and hints"""
+    return profiles.Branding(
+        profile=profile,
+        bundles=theme.build_bundles(urls, font_manifest, image_manifest, profile.theme,
+                                    background=profile.background, font_faces=profile.fonts),
+        agents=profiles.agents_for(profile, agent_map),
+        warmup_html=_warmup_html(urls, image_manifest, script, profile.logo),
+    )
+
+
+def _build(previous=None):
+    """Build the state; a rebuild keeps the signing key of the previous state
+    so a generated key does not log every session out"""
+    started = time.perf_counter()
+    shared = config.freeze(config.load())
+    required = config.stateless()
+    font_manifest = fonts.load_manifest()
+    image_manifest = images.load_manifest()
+    urls = assets.publish(exclude=image_manifest.get("unused", ()))
+    agent_map = agents.from_config(shared)
+    profile_map = profiles.from_config(shared, agent_map)
+    missing = urls.missing(referenced_assets(font_manifest, image_manifest, profile_map.values()))
+    if missing:
+        _LOGGER.warning("Missing assets, pages will render without them: %s", ", ".join(missing))
+    script = vendor.widget_script()
+    brandings = profiles.BrandingCache(
+        lambda key: _branding(profile_map[key], urls, font_manifest, image_manifest, agent_map, script),
+        maxsize=cache_size(),
+    )
+    # Hot profiles first, so they are what the cache holds when it is full
+    for key, profile in reversed(list(profile_map.items())):
+        if profile.warm or key == next(iter(profile_map)):
+            brandings.get(key)
+    return State(
+        config=shared,
+        font_manifest=font_manifest,
+        image_manifest=image_manifest,
+        urls=urls,
+        missing_assets=missing,
+        agents=agent_map,
+        profiles=profile_map,
+        brandings=brandings,
+        widget_script=script,
+        auth_secret=previous.auth_secret if previous else auth.load_secret(required=required),
+        password_hash=auth.load_password_hash(required=required, config=shared),
+        cookie_ttl=auth.cookie_ttl(shared),
+        seconds=time.perf_counter() - started,
+    )
+
+
+def warm():
+    """Build the state on first call and return it; later calls are a lookup
+
+    Every check_interval() seconds, or after request_reload(), one call
+    also checks assets/ and the config file and rebuilds the state if
+    either changed. Sessions pick up the new state on their next run; a
+    failed rebuild keeps the previous state.
+    """
+    global _state, _error, _attempted_stamp, _reload_error
+    if _state is not None and not _check_due() and not _reload_requested.is_set():
+        return _state
+    with _lock:
+        if _state is None:
+            _reload_requested.clear()
+            _attempted_stamp = config.stamp()
+            try:
+                _state = _build()
+            except Exception as exc:
+                _error = exc
+                raise
+            _error = None
+            _mark_checked()
+            _LOGGER.info("Warm-up finished in %.2fs", _state.seconds)
+        elif _check_due() or _reload_requested.is_set():
+            _mark_checked()
+            reason = _stale(_state)
+            if reason:
+                _LOGGER.info("%s, rebuilding", reason)
+                _attempted_stamp = config.stamp()
+                try:
+                    _state = _build(previous=_state)
+                except Exception as exc:
+                    _reload_error = exc
+                    _LOGGER.exception("Rebuild failed, keeping the previous state")
+                else:
+                    _reload_error = None
+    return _state
+
+
+def request_reload():
+    """Rebuild the state in the background, e.g. on SIGHUP; safe to call
+    from a signal handler"""
+    _reload_requested.set()
+    warm_in_background()
+
+
+def _stale(state):
+    """Why state must be rebuilt, or None"""
+    if _reload_requested.is_set():
+        _reload_requested.clear()
+        return "Reload requested"
+    if config.stamp() != _attempted_stamp:
+        return "Config changed"
+    if state.urls.stale():
+        return "Assets changed on disk"
+    return None
+
+
+def _check_due():
+    interval = check_interval()
+    return bool(interval) and time.monotonic() - _checked_at >= interval
+
+
+def _mark_checked():
+    global _checked_at
+    _checked_at = time.monotonic()
+
+
+def warm_in_background():
+    """Start warm() on a daemon thread; failures are reported through /ready"""
+    def run():
+        try:
+            warm()
+        except Exception:
+            _LOGGER.exception("Warm-up failed")
+
+    thread = threading.Thread(target=run, name="herd-warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+def is_ready():
+    return _state is not None
+
+
+def _json(status, payload):
+    body = json.dumps(payload).encode()
+    return status, {"Content-Type": "application/json", "Cache-Control": "no-store"}, body
+
+
+@sidecar.route("/healthz")
+def _healthz(request):
+    return _json(200, {"status": "ok"})
+
+
+@sidecar.route("/ready")
+def _ready(request):
+    state = _state
+    payload = {"ready": state is not None, "stateless": config.stateless()}
+    if state is not None:
+        payload["warmup_seconds"] = round(state.seconds, 3)
+        payload["profiles"] = list(state.profiles)
+        payload["warm_profiles"] = state.brandings.keys()
+        payload["agents"] = sorted(state.agents)
+        payload["missing_assets"] = state.missing_assets
+        if _reload_error is not None:
+            payload["reload_error"] = str(_reload_error)
+    elif _error is not None:
+        payload["error"] = str(_error)
+    return _json(200 if state is not None else 503, payload)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.parse_args(argv)
+    state = warm()
+    print(f"built in {state.seconds:.2f}s: {len(state.urls)} assets, "
+          f"profiles {', '.join(state.profiles)}, agents {', '.join(sorted(state.agents))}")
+    for name in state.missing_assets:
+        print(f"missing: {name}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+from herd import auth
+
+SECRET = "test-secret"
+NOW = 1_700_000_000
+
+
+def test_signed_token_verifies_until_expiry():
+    token = auth.sign_token(SECRET, ttl=60, now=NOW)
+    assert auth.verify_token(SECRET, token, now=NOW)
+    assert not auth.verify_token(SECRET, token, now=NOW + 61)
+
+
+def test_token_from_another_secret_is_rejected():
+    assert not auth.verify_token(SECRET, auth.sign_token("other", now=NOW), now=NOW)
+
+
+def test_non_ascii_signature_is_rejected():
+    payload = auth.sign_token(SECRET, now=NOW).rsplit(".", 1)[0]
+    assert not auth.verify_token(SECRET, f"{payload}.sïgnätüre", now=NOW)
+    assert not auth.verify_token(SECRET, f"{payload}.\udcff", now=NOW)
+
+
+def test_malformed_tokens_are_rejected():
+    valid = auth.sign_token(SECRET, now=NOW)
+    version, expiry, signature = valid.split(".")
+    for token in ("", None, "v1", "v1.123", f"{valid}.extra", f"v2.{expiry}.{signature}",
+                  f"v1.soon.{signature}", f"v1.{expiry}.", "..", "v1.٣.x"):
+        assert not auth.verify_token(SECRET, token, now=NOW), token
+
+
+def test_password_hash_round_trip():
+    encoded = auth.hash_password("hunter2", iterations=1000)
+    assert auth.verify_password("hunter2", encoded)
+    assert not auth.verify_password("hunter3", encoded)
+    assert not auth.verify_password("hunter2", "not-a-hash")
@@ -0,0 +1,90 @@
+import re
+import shutil
+import subprocess
+from pathlib import Path
+
+import pytest
+
+from herd import assets, loginpage, sidecar, vendor  # noqa: F401  register routes
+
+README = Path(__file__).resolve().parent.parent / "README.md"
+PUBLIC = "http://127.0.0.1:9109"
+STREAMLIT = "http://127.0.0.1:8501"
+FORWARDED = ("Host", "X-Forwarded-For", "X-Forwarded-Proto")
+
+
+def _example():
+    blocks = re.findall(r"```nginx\n(.*?)```", README.read_text(), re.S)
+    assert len(blocks) == 1
+    return blocks[0]
+
+
+def _locations(config):
+    """{location match: body}, for the flat location blocks of the example"""
+    locations = {}
+    for match in re.finditer(r"location\s+([^{]+?)\s*\{", config):
+        depth, end = 1, match.end()
+        while depth:
+            depth += {"{": 1, "}": -1}.get(config[end], 0)
+            end += 1
+        locations[match.group(1)] = config[match.end():end - 1]
+    return locations
+
+
+def _proxied(locations, path):
+    """proxy_pass target nginx picks for path: exact, then longest prefix"""
+    if f"= {path}" in locations:
+        body = locations[f"= {path}"]
+    else:
+        prefix = max((loc for loc in locations if not loc.startswith("=") and path.startswith(loc)), key=len)
+        body = locations[prefix]
+    return re.search(r"proxy_pass\s+([^;]+);", body).group(1)
+
+
+def test_public_sidecar_routes_reach_the_public_listener():
+    locations = _locations(_example())
+    routes = [path for _, path in sidecar._routes[True]]
+    routes += [prefix + "file" for _, prefix, _ in sidecar._prefix_routes[True]]
+    assert routes
+    for path in routes:
+        assert _proxied(locations, path) == PUBLIC, path
+
+
+def test_streamlit_paths_reach_streamlit():
+    locations = _locations(_example())
+    for path in ("/", "/_stcore/stream", "/_stcore/health", "/static/js/main.js", "/app/static/assets/x.jpg"):
+        assert _proxied(locations, path) == STREAMLIT, path
+    assert "9108" not in _example()  # the operator listener stays private
+
+
+def test_websocket_is_upgraded():
+    config = _example()
+    stream = _locations(config)["/_stcore/stream"]
+    assert "proxy_http_version 1.1;" in config
+    assert "proxy_set_header Upgrade $http_upgrade;" in stream
+    assert "proxy_set_header Connection $connection_upgrade;" in stream
+
+
+def test_forwarding_headers_reach_every_location():
+    config = _example()
+    server_level = re.sub(r"location\s+[^{]+\{.*?\n    \}", "", config, flags=re.S)
+    for name, body in {"server": server_level, **_locations(config)}.items():
+        # A location with its own proxy_set_header inherits none from the server
+        if name == "server" or "proxy_set_header" in body:
+            for header in FORWARDED:
+                assert f"proxy_set_header {header} " in body, (name, header)
+
+
+def test_anonymous_root_redirects_to_login():
+    body = _locations(_example())["= /"]
+    assert 'if ($cookie_herd_ai_auth = "") { return 302 /login; }' in body
+
+
+@pytest.mark.skipif(shutil.which("nginx") is None, reason="nginx not installed")
+def test_nginx_accepts_the_example(tmp_path):
+    conf = tmp_path / "nginx.conf"
+    conf.write_text(f"pid {tmp_path}/nginx.pid;\nerror_log stderr;\nevents {{}}\n"
+                    f"http {{\naccess_log off;\n{_example()}}}\n")
+    result = subprocess.run(["nginx", "-t", "-p", str(tmp_path), "-c", str(conf)],
+                            capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
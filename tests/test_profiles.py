@@ -0,0 +1,29 @@
+import pytest
+
+from herd import profiles
+
+AGENTS = {"herd": object()}
+
+
+def test_profiles_from_config():
+    config = {"profiles": {"cup": {"title": "Cup AI", "hosts": ["Cup.Example.com"], "agents": ["herd"],
+                                   "copy": {"login_button": "GO"}}}}
+    profile = profiles.from_config(config, AGENTS)["cup"]
+    assert profile.title == "Cup AI"
+    assert profile.hosts == ("cup.example.com",)
+    assert profile.copy["login_button"] == "GO"
+
+
+@pytest.mark.parametrize("table, unknown", [
+    ({"titel": "Cup AI"}, "titel"),
+    ({"title": "Cup AI", "bakground": "x.png", "logos": "y.png"}, "bakground, logos"),
+    ({"key": "other"}, "key"),
+])
+def test_unknown_profile_keys_are_config_errors(table, unknown):
+    with pytest.raises(ValueError, match=f"Profile cup sets unknown keys: {unknown}$"):
+        profiles.from_config({"profiles": {"cup": table}}, AGENTS)
+
+
+def test_unknown_copy_is_a_config_error():
+    with pytest.raises(ValueError, match="Profile cup sets unknown copy: greeting"):
+        profiles.from_config({"profiles": {"cup": {"copy": {"greeting": "Hi"}}}}, AGENTS)
@@ -0,0 +1,60 @@
+import pytest
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+from herd import ratelimit
+from herd.config import ROOT
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_client_bucket_throttles_one_address_only():
+    limiter = ratelimit.LoginRateLimiter(per_client=(3, 0.1), overall=(100, 10.0), clock=Clock())
+    assert all(limiter.attempt("203.0.113.7")[0] for _ in range(3))
+    allowed, wait = limiter.attempt("203.0.113.7")
+    assert not allowed and wait == pytest.approx(10.0)
+    assert limiter.attempt("198.51.100.2")[0]
+
+
+def test_unidentified_clients_only_spend_the_global_bucket():
+    limiter = ratelimit.LoginRateLimiter(per_client=(1, 0.1), overall=(5, 1.0), clock=Clock())
+    assert all(limiter.attempt(None)[0] for _ in range(5))
+    assert not limiter.attempt(None)[0]
+    assert len(limiter) == 0
+
+
+@pytest.mark.parametrize("headers, peer, hops, expected", [
+    ({"X-Forwarded-For": "1.1.1.1"}, "203.0.113.7", 0, "203.0.113.7"),
+    ({"X-Forwarded-For": "spoofed, 198.51.100.2"}, "127.0.0.1", 1, "198.51.100.2"),
+    ({"X-Forwarded-For": "spoofed, 198.51.100.2, 10.0.0.5"}, "127.0.0.1", 2, "198.51.100.2"),
+    ({"X-Forwarded-For": "198.51.100.2"}, "127.0.0.1", 3, "198.51.100.2"),
+    ({}, "127.0.0.1", 0, None),
+    ({}, "::1", 1, None),
+    ({}, None, 0, None),
+    ({}, "", 0, None),
+])
+def test_client_address(headers, peer, hops, expected):
+    assert ratelimit.client_address(headers, peer, hops=hops) == expected
+
+
+def test_app_throttles_repeated_wrong_passwords(monkeypatch):
+    # AppTest sessions have no real address, so pin the key to one
+    monkeypatch.setattr(ratelimit, "client_key", lambda: "203.0.113.7")
+    monkeypatch.setattr(ratelimit, "_shared", None)
+    st.cache_resource.clear()
+    at = AppTest.from_file(str(ROOT / "app.py"), default_timeout=30).run()
+    for attempt in range(5):
+        at.text_input[0].input("wrong")
+        at.button[0].click()
+        at.run()
+        assert "Incorrect password" in at.error[0].value, attempt
+    at.text_input[0].input("wrong")
+    at.button[0].click()
+    at.run()
+    assert "Too many login attempts" in at.error[0].value
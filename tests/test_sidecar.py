@@ -0,0 +1,61 @@
+import json
+import urllib.error
+import urllib.request
+
+import pytest
+
+from herd import assets, loginpage, metrics, sidecar, vendor, warmup  # noqa: F401  register routes
+
+ENTRY = {"file": "convai-widget-embed.0123abcd.js", "integrity": "sha384-test",
+         "cdn_url": "https://unpkg.com/@elevenlabs/convai-widget-embed@1.0.0"}
+
+
+@pytest.mark.parametrize("path", ["/metrics", "/ready", "/healthz"])
+def test_operator_routes_are_not_public(path):
+    assert sidecar._find("GET", path) is not None
+    assert sidecar._find("GET", path, public=True) is None
+
+
+@pytest.mark.parametrize("method, path", [("GET", "/login"), ("POST", "/login"),
+                                          ("GET", "/assets/fonts/x.woff2"), ("GET", "/vendor/x.js")])
+def test_public_routes_are_only_public(method, path):
+    assert sidecar._find(method, path, public=True) is not None
+    assert sidecar._find(method, path) is None
+
+
+def test_listeners_answer_only_their_routes():
+    public = sidecar._listen("test-public", "127.0.0.1", 0, public=True)
+    operator = sidecar._listen("test-operator", "127.0.0.1", 0, public=False)
+    try:
+        with pytest.raises(urllib.error.HTTPError) as missing:
+            urllib.request.urlopen(f"http://127.0.0.1:{public.server_port}/metrics", timeout=5)
+        assert missing.value.code == 404
+        with urllib.request.urlopen(f"http://127.0.0.1:{operator.server_port}/healthz", timeout=5) as resp:
+            assert json.load(resp) == {"status": "ok"}
+    finally:
+        for name, server in (("test-public", public), ("test-operator", operator)):
+            server.shutdown()
+            server.server_close()
+            sidecar._servers.pop(name)
+
+
+def test_widget_script_defaults_to_streamlit_static_route(monkeypatch):
+    monkeypatch.delenv("HERD_VENDOR_URL", raising=False)
+    monkeypatch.setattr(vendor, "VENDOR_DIR", assets.STATIC_DIR / "vendor")
+    monkeypatch.setattr(vendor, "static_serves_scripts", lambda: True)
+    assert vendor.widget_script({vendor.NAME: ENTRY}) == (
+        "app/static/vendor/convai-widget-embed.0123abcd.js", "sha384-test")
+
+
+def test_widget_script_falls_back_to_pinned_cdn(monkeypatch, tmp_path):
+    monkeypatch.delenv("HERD_VENDOR_URL", raising=False)
+    monkeypatch.setattr(vendor, "static_serves_scripts", lambda: False)
+    assert vendor.widget_script({vendor.NAME: ENTRY}) == (ENTRY["cdn_url"], "sha384-test")
+    monkeypatch.setattr(vendor, "static_serves_scripts", lambda: True)
+    monkeypatch.setattr(vendor, "VENDOR_DIR", tmp_path)  # outside static/
+    assert vendor.widget_script({vendor.NAME: ENTRY}) == (ENTRY["cdn_url"], "sha384-test")
+
+
+def test_widget_script_prefers_vendor_url():
+    assert vendor.widget_script({vendor.NAME: ENTRY}, base_url="https://herd.example.com/") == (
+        "https://herd.example.com/vendor/convai-widget-embed.0123abcd.js", "sha384-test")
@@ -0,0 +1,88 @@
+import itertools
+import re
+
+import pytest
+
+from herd import theme
+
+
+def _style_rules(rules):
+    """(selector, declarations) of every style rule in source order, with
+    @media and @supports bodies flattened as if they applied"""
+    for prelude, body in rules:
+        if isinstance(body, list):
+            yield from _style_rules(body)
+        elif not prelude.startswith("@"):
+            yield prelude, body
+
+
+def _computed(rules, selectors):
+    """Winning {property: value} on an element matched by every selector in
+    selectors, assuming equal specificity so only order and !important count"""
+    winners = {}
+    for selector, declarations in _style_rules(rules):
+        if selector not in selectors:
+            continue
+        for prop, (value, important) in declarations.items():
+            current = winners.get(prop)
+            if current is None or important or not current[1]:
+                winners[prop] = (value, important)
+    return winners
+
+
+def _unmerged(css):
+    """The rules compile_css sees, each in its own place"""
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    rules = []
+    for prelude, body in theme._parse(css):
+        if prelude.startswith("@media") or prelude.startswith("@supports"):
+            rules.append((prelude, _unmerged(body)))
+        elif not prelude.startswith("@"):
+            rules.append((re.sub(r"\s*([>,])\s*", r"\1", prelude), theme._declarations(body)))
+    return rules
+
+
+def _merged(css):
+    return _unmerged(theme.compile_css(css))
+
+
+def test_merge_keeps_the_winner_across_an_overlapping_rule():
+    css = """
+    .main > div { padding-bottom: 4rem; }
+    .stApp > div { padding-bottom: 6rem; }
+    .main > div { padding-top: 0.5rem; }
+    """
+    before, after = _unmerged(css), _merged(css)
+    both = {".main>div", ".stApp>div"}
+    assert _computed(before, both)["padding-bottom"] == ("6rem", False)
+    assert _computed(after, both) == _computed(before, both)
+
+
+@pytest.mark.parametrize("earlier, between", [
+    ("padding: 1rem", "padding-bottom: 2rem"),
+    ("padding-bottom: 1rem", "padding: 2rem"),
+    ("top: 0", "inset: 1px"),
+    ("-webkit-backdrop-filter: none", "backdrop-filter: blur(4px)"),
+])
+def test_overlapping_properties_block_the_merge(earlier, between):
+    css = f".a {{ {earlier}; }} .b {{ {between}; }} .a {{ color: red; }}"
+    assert theme.compile_css(css).count(".a{") == 2
+
+
+def test_unrelated_rules_in_between_still_merge():
+    css = ".a { color: red; } .b { padding: 0; } .a { margin: 0; }"
+    assert theme.compile_css(css) == ".b{padding:0}.a{color:red;margin:0}"
+
+
+def test_media_rules_in_between_are_checked():
+    css = ".a { color: red; } @media (max-width: 10px) { .b { color: blue; } } .a { margin: 0; }"
+    assert theme.compile_css(css).count(".a{") == 2
+
+
+@pytest.mark.parametrize("view", theme.VIEWS)
+def test_compiled_stylesheet_keeps_every_winner(view):
+    css = theme.stylesheet(view, {})
+    before, after = _unmerged(css), _merged(css)
+    selectors = sorted({selector for selector, _ in _style_rules(before)})
+    for pair in itertools.combinations(selectors, 2):
+        assert _computed(after, set(pair)) == _computed(before, set(pair)), pair